@@ -1,59 +1,420 @@
 # Import necessary libraries
+import importlib.util
+import logging
+import os
+import sys
+import threading
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
-@st.cache_data
+def lazy_import(name):
+    """
+    Return a module that is only executed when one of its attributes is first used.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+# plotly.express takes a large share of the startup time; it is loaded by the first chart drawn
+px = lazy_import("plotly.express")
+
+# Pipeline modules live in scritpts/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scritpts"))
+from analytics import cell_detection_rates, count_by, richness, total, value_table
+from beta_diversity import METRICS, nearest_plots, plot_matrix
+from biodiversity import biodiversity_table
+from chart_policy import CHART_POLICY, apply_policy, log_figure_payload, scatter_render_mode
+from cube import FILTER_DIMENSIONS, build_cube, index_cube, slice_cuboid
+from dataset import CLEANED_DATASET, map_shared, memory_report, read_compact
+from hierarchy import ROOT, children, level_table, node_species, rollup_tree
+from profiling import stage
+from snapshots import SNAPSHOT_DIR, current_snapshot, snapshot_database, snapshot_signature
+import sql_backend
+from temporal import hour_of_day, survey_effort
+
+# Set up logging (chart payload sizes, in points, are logged per rerun)
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Columns used by the dashboard; everything else stays on disk
+DASHBOARD_COLUMNS = [
+    'location_type', 'admin_unit_code', 'plot_name', 'month', 'observer', 'visit',
+    'distance', 'flyover_observed', 'common_name', 'scientific_name', 'aou_code',
+    'sky', 'wind', 'date', 'start_seconds', 'end_seconds',
+]
+
+# Filter dimensions that are constant within a survey; the species filter narrows detections, not effort
+EFFORT_DIMENSIONS = ['location_type', 'observer']
+
+# Where chart aggregations run: 'memory' (the in-process cube) or 'sql' (the snapshot's
+# SQLite or DuckDB database, published with `data_preprocessing.py --sql-backend`)
+DASHBOARD_BACKEND = os.environ.get("DASHBOARD_BACKEND", "memory")
+
+# Fast start: show the key metrics from the snapshot's precomputed summary, load the dataset
+# in the background and warm the caches of the default view once it is loaded
+FAST_START = os.environ.get("DASHBOARD_FAST_START", "0") == "1"
+
+# Upper bound on cached results per aggregation; least recently used entries are evicted first
+AGGREGATION_CACHE_ENTRIES = 256
+
 def load_data(file_path):
     """
-    Load the cleaned dataset and preprocess it.
+    Load the cleaned dataset as a compact frame; it must be treated as read-only.
+
+    A published snapshot is memory-mapped, which skips decoding Parquet; without one, the
+    Parquet dataset is read. Every server process still builds its own frame and cube.
     """
-    data = pd.read_csv(file_path)
-    
-    # Ensure 'date' is in datetime format
-    data['date'] = pd.to_datetime(data['date'], errors='coerce')
-    
-    # Extract 'month' from 'date'
-    data['month'] = data['date'].dt.month
-    
+    if file_path.endswith(".arrow"):
+        data = map_shared(file_path, columns=DASHBOARD_COLUMNS)
+    else:
+        data = read_compact(file_path, columns=DASHBOARD_COLUMNS)
+    data = data.assign(start_hour=hour_of_day(data['start_seconds']).astype('Int8'))
+    logging.info(f"Loaded {len(data)} rows using {memory_report(data)['bytes'].sum() / 2**20:.1f} MiB")
     return data
 
-# Load the data
-data = load_data("data\cleaned_bird_data.csv")
+def load_bundle(file_path, version):
+    """
+    Load one dataset version and build everything the charts read: the pre-aggregated cube
+    (so charts sum cube cells instead of rescanning observations), its bitmap filter index
+    and the survey effort per start hour, habitat and observer.
+
+    With the SQL backend, nothing is loaded into memory: the bundle points at the
+    snapshot's database and every chart queries it.
+    """
+    if DASHBOARD_BACKEND == "sql":
+        database = snapshot_database(file_path)
+        if database is not None:
+            return load_database_bundle(database, version)
+        logging.warning(f"No SQL database for dataset version {version}; using the in-memory cube")
+    data = load_data(file_path)
+    cube = build_cube(data)
+    species_cells = cube['species']
+    return {
+        'version': version,
+        'cube': cube,
+        'index': index_cube(cube),
+        'cuboids': set(cube),
+        'options': {dim: species_cells[dim].unique() for dim in ('common_name', 'observer')},
+        'effort': survey_effort(data, EFFORT_DIMENSIONS),
+    }
+
+def load_database_bundle(database, version):
+    """
+    Describe one dataset version served from its SQL database: the cuboids it can answer,
+    the sidebar options and the survey effort, which is small enough to keep in memory.
+    """
+    return {
+        'version': version,
+        'database': database,
+        'cuboids': sql_backend.available_cuboids(database),
+        'options': {dim: sql_backend.distinct_values(database, dim) for dim in ('common_name', 'observer')},
+        'effort': sql_backend.survey_effort(database, EFFORT_DIMENSIONS),
+    }
+
+# Data locations: published snapshots first, the Parquet dataset when nothing is published
+project_dir = os.path.dirname(os.path.abspath(__file__))
+snapshot_dir = os.path.join(project_dir, SNAPSHOT_DIR)
+parquet_path = os.path.join(project_dir, CLEANED_DATASET)
+
+def locate_dataset():
+    """
+    Return the path and version of the dataset to serve.
+    """
+    snapshot = current_snapshot(snapshot_dir)
+    if snapshot is not None:
+        return snapshot['path'], snapshot['version']
+    return parquet_path, 'parquet'
+
+@st.cache_resource
+def dataset_state(snapshot_dir):
+    """
+    Per-process holder of the loaded dataset bundles, shared by every session.
+    """
+    return {'lock': threading.Lock(), 'signature': None, 'current': None, 'bundles': {}, 'reloading': False,
+            'loaded': threading.Event()}
+
+def reload_dataset(state, signature):
+    """
+    Load the current snapshot in the background and swap it in once it is ready.
+
+    Sessions keep being served from the previous bundle meanwhile; it is kept for reruns
+    that started before the swap. A snapshot that fails to load is logged and skipped.
+    In fast-start mode the caches of the default view are warmed after the swap.
+    """
+    warm = None
+    try:
+        file_path, version = locate_dataset()
+        if version != state['current']:
+            bundle = load_bundle(file_path, version)
+            previous = state['current']
+            kept = {previous: state['bundles'][previous]} if previous in state['bundles'] else {}
+            state['bundles'] = {**kept, version: bundle}
+            state['current'] = version
+            # Close the database connections of versions no longer served
+            sql_backend.retire_connections({loaded['database'] for loaded in state['bundles'].values()
+                                            if 'database' in loaded})
+            logging.info(f"Swapped in dataset version {version}")
+            warm = version if FAST_START else None
+    except Exception:
+        logging.exception("Could not load the published dataset; serving the previous version")
+    finally:
+        state['signature'] = signature
+        state['reloading'] = False
+        state['loaded'].set()
+    if warm is not None:
+        warm_caches(warm)
+
+def current_version():
+    """
+    Return the dataset version to serve.
+
+    The first call in a process loads the dataset; in fast-start mode it only starts
+    loading it in the background and returns the version being loaded. Later calls only
+    stat the snapshot pointer and, when a new snapshot was published, start a background reload.
+    """
+    state = dataset_state(snapshot_dir)
+    signature = snapshot_signature(snapshot_dir)
+    with state['lock']:
+        if state['current'] is None and FAST_START and not state['loaded'].is_set():
+            if not state['reloading']:
+                state['reloading'] = True
+                threading.Thread(target=reload_dataset, args=(state, signature), daemon=True).start()
+            return locate_dataset()[1]
+        if state['current'] is None:
+            file_path, version = locate_dataset()
+            state['bundles'] = {version: load_bundle(file_path, version)}
+            state['current'], state['signature'] = version, signature
+            state['loaded'].set()
+        elif signature != state['signature'] and not state['reloading']:
+            state['reloading'] = True
+            threading.Thread(target=reload_dataset, args=(state, signature), daemon=True).start()
+    return state['current']
+
+def bundle(version):
+    """
+    Return the loaded bundle of a dataset version, or the current one if it was dropped.
+
+    Waits for the first dataset of the process while it is loading in the background.
+    """
+    state = dataset_state(snapshot_dir)
+    state['loaded'].wait()
+    bundles = state['bundles']
+    if not bundles:
+        raise RuntimeError("The dataset could not be loaded; see the log for details")
+    return bundles[version] if version in bundles else bundles[state['current']]
+
+def dataset_loaded():
+    """
+    Return whether the first dataset of the process has been loaded.
+    """
+    return dataset_state(snapshot_dir)['loaded'].is_set()
+
+@st.cache_data
+def snapshot_summary(version):
+    """
+    Return the key metrics and filter options precomputed for a snapshot, or None if it has none.
+    """
+    snapshot = current_snapshot(snapshot_dir)
+    if snapshot is None or snapshot['version'] != version:
+        return None
+    return snapshot.get('summary')
+
+def normalize_filters(version, habitat, species, observer):
+    """
+    Turn the dataset version and sidebar selections into a hashable key that ignores selection order.
+
+    Cached results are keyed by it, so a newly published dataset never serves stale results.
+    """
+    selections = ([habitat] if habitat != "All" else [], species, observer)
+    return version, tuple((dimension, tuple(sorted(values))) for dimension, values in zip(FILTER_DIMENSIONS, selections))
+
+def cells(filter_key, name):
+    """
+    Return the cube cells of a cuboid matching a filter key.
+
+    They are a view of the loaded cube, or the result of one parameterized query when the
+    dataset is served from its SQL database. Callers cache their aggregations by filter key.
+    """
+    version, filters = filter_key
+    loaded = bundle(version)
+    if 'database' in loaded:
+        return sql_backend.cuboid_cells(loaded['database'], name, dict(filters))
+    return slice_cuboid(loaded['cube'], name, dict(filters), loaded['index'])
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def key_metrics(filter_key):
+    """
+    Total observations, unique species and unique observers for a filter key.
+    """
+    species_cells = cells(filter_key, 'species')
+    return total(species_cells, 'count'), species_cells['scientific_name'].nunique(), species_cells['observer'].nunique()
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def observation_counts(filter_key, name, by):
+    """
+    Observation counts of a cuboid grouped by the given dimensions.
+    """
+    return count_by(cells(filter_key, name), list(by), weight='count')
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def value_counts(filter_key, name, dimension):
+    """
+    Observation counts per value of a dimension, largest first (like value_counts).
+    """
+    return value_table(cells(filter_key, name), dimension, weight='count')
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def species_richness(filter_key, by, top=None):
+    """
+    Number of distinct species per group of plot-level cells, richest first when `top` is given.
+    """
+    return richness(cells(filter_key, 'plot_species'), list(by), top)
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def location_tree(filter_key):
+    """
+    Habitat -> admin unit -> plot rollup of the plot-level cells: counts, richness and species per node.
+
+    The plot, admin unit, hotspot and drill-down sections all read it, so one pass over
+    the cells serves them for a filter key.
+    """
+    return rollup_tree(cells(filter_key, 'plot_species'), weight='count')
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def diversity(filter_key):
+    """
+    Diversity indices of every plot and habitat for a filter key, from the plot-level cells.
+    """
+    return biodiversity_table(cells(filter_key, 'plot_species'), weight='count')
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def plot_species_matrix(filter_key):
+    """
+    Sparse plot x species abundance matrix for a filter key, from the plot-level cells.
+    """
+    return plot_matrix(cells(filter_key, 'plot_species'), weight='count')
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def similar_plots(filter_key, plot, metric, k):
+    """
+    The `k` plots whose species composition is closest to `plot`.
+    """
+    matrix, plots = plot_species_matrix(filter_key)
+    return nearest_plots(matrix, plots, plot, k, metric)
+
+@st.cache_data(max_entries=AGGREGATION_CACHE_ENTRIES)
+def hourly_rates(filter_key, by=()):
+    """
+    Observations per survey hour for each start hour (and the given dimensions) under a filter key.
+    """
+    version, filters = filter_key
+    return cell_detection_rates(cells(filter_key, 'hour'), bundle(version)['effort'], dict(filters), by)
+
+def warm_caches(version):
+    """
+    Compute the aggregations of the unfiltered default view (key metrics and the sections
+    open by default), so the first sessions after a start find them cached.
+    """
+    filter_key = normalize_filters(version, "All", [], [])
+    try:
+        with stage("warm_caches"):
+            key_metrics(filter_key)
+            observation_counts(filter_key, 'month', ('month',))
+            location_tree(filter_key)
+    except Exception:
+        logging.exception("Could not warm the dashboard caches")
+
+# Load the data (in fast-start mode, the filter options come from the snapshot summary)
+version = current_version()
+summary = snapshot_summary(version) if FAST_START else None
+filter_options = summary['options'] if summary is not None else bundle(version)['options']
 
 # Sidebar filters
 st.sidebar.header("Filters")
 
 # Habitat filter
 habitat = st.sidebar.selectbox("Select Habitat", ["All", "Forest", "Grassland"])
-filtered_data = data.copy()
-if habitat != "All":
-    filtered_data = filtered_data[filtered_data['location_type'] == habitat]
 
 # Species filter
-species = st.sidebar.multiselect("Select Species", options=data['common_name'].unique(), default=None)
-if species:
-    filtered_data = filtered_data[filtered_data['common_name'].isin(species)]
+species = st.sidebar.multiselect("Select Species", options=filter_options['common_name'], default=None)
 
 # Observer filter
-observer = st.sidebar.multiselect("Select Observer", options=data['observer'].unique(), default=None)
-if observer:
-    filtered_data = filtered_data[filtered_data['observer'].isin(observer)]
+observer = st.sidebar.multiselect("Select Observer", options=filter_options['observer'], default=None)
+
+filter_key = normalize_filters(version, habitat, species, observer)
+
+# Rendering policy for high-cardinality charts
+st.sidebar.header("Rendering")
+max_categories = st.sidebar.slider("Max categories per chart", min_value=5, max_value=200,
+                                   value=CHART_POLICY['aou_code']['top_n'])
+chart_policy = {name: dict(policy, top_n=max_categories) for name, policy in CHART_POLICY.items()}
+
+def show_chart(name, fig):
+    """
+    Render a figure, logging the size of the payload sent to the browser.
+    """
+    log_figure_payload(name, fig)
+    st.plotly_chart(fig)
+
+# Chart sections, in page order. Each renders only while its toggle is on, so a rerun
+# aggregates and draws just the open sections.
+SECTIONS = []
+
+def section(title, cuboid, default_open=False):
+    """
+    Register a chart section rendered from a cube cuboid.
+
+    The decorated function takes the current view (filter key, selected species and
+    rendering policy) and draws the section's chart.
+    """
+    def register(render):
+        SECTIONS.append({'title': title, 'cuboid': cuboid, 'default_open': default_open, 'render': render})
+        return render
+    return register
+
+def render_sections(view):
+    """
+    Draw the toggle of every available section and render the open ones.
+
+    Each rendered section is measured as a stage, so every rerun logs the wall time, CPU
+    time and peak memory growth of the sections it drew.
+    """
+    version, _ = view['filter_key']
+    for entry in SECTIONS:
+        if entry['cuboid'] not in bundle(version)['cuboids']:
+            continue
+        st.subheader(entry['title'])
+        if st.toggle("Show chart", value=entry['default_open'], key=f"section_{entry['render'].__name__}"):
+            with stage(f"section.{entry['render'].__name__}"):
+                entry['render'](view)
 
 # Main dashboard
 st.title("Bird Species Observation Analysis")
 
-# Key metrics
+# Key metrics (the unfiltered ones are precomputed in fast-start mode)
+with stage("section.key_metrics"):
+    if summary is not None and not any(values for _, values in filter_key[1]):
+        total_observations, unique_species, unique_observers = (
+            summary['observations'], summary['species'], summary['observers'])
+    else:
+        total_observations, unique_species, unique_observers = key_metrics(filter_key)
 st.subheader("Key Metrics")
-st.metric("Total Observations", len(filtered_data))
-st.metric("Unique Species", filtered_data['scientific_name'].nunique())
-st.metric("Unique Observers", filtered_data['observer'].nunique())
+st.metric("Total Observations", total_observations)
+st.metric("Unique Species", unique_species)
+st.metric("Unique Observers", unique_observers)
 
 # Temporal analysis: Observation frequency by month
-st.subheader("Observation Frequency by Month")
-if 'month' in filtered_data.columns:
-    monthly_data = filtered_data.groupby(['month', 'common_name']).size().reset_index(name='observation_count')
-    if species:
+@section("Observation Frequency by Month", cuboid='month', default_open=True)
+def monthly_section(view):
+    """
+    Draw the monthly observation counts.
+    """
+    if view['species']:
+        monthly_data = observation_counts(view['filter_key'], 'month', ('month', 'common_name'))
         # Highlight selected species in the plot
         fig = px.bar(
             monthly_data,
@@ -67,7 +428,7 @@ if 'month' in filtered_data.columns:
         )
     else:
         # General plot without species differentiation
-        monthly_data = filtered_data.groupby('month').size().reset_index(name='observation_count')
+        monthly_data = observation_counts(view['filter_key'], 'month', ('month',))
         fig = px.bar(
             monthly_data,
             x='month',
@@ -76,14 +437,51 @@ if 'month' in filtered_data.columns:
             labels={'observation_count': 'Number of Observations', 'month': 'Month'},
             color_discrete_sequence=['#636EFA']
         )
-    st.plotly_chart(fig)
+    show_chart('monthly_counts', fig)
+
+# Temporal analysis: Effort-normalized detection rate by survey start hour
+@section("Detection Rate by Hour", cuboid='hour')
+def detection_rate_section(view):
+    """
+    Draw the observations per survey hour for each survey start hour.
+    """
+    if view['species']:
+        rate_data = hourly_rates(view['filter_key'], ('common_name',))
+        # Highlight selected species in the plot
+        fig = px.line(
+            rate_data,
+            x='start_hour',
+            y='detection_rate',
+            color='common_name',
+            markers=True,
+            render_mode=scatter_render_mode(len(rate_data)),
+            title="Detection Rate by Hour (Differentiated by Species)",
+            labels={'detection_rate': 'Observations per Survey Hour', 'start_hour': 'Survey Start Hour'},
+            color_discrete_sequence=px.colors.qualitative.Set2
+        )
+    else:
+        # General plot without species differentiation
+        rate_data = hourly_rates(view['filter_key'])
+        fig = px.line(
+            rate_data,
+            x='start_hour',
+            y='detection_rate',
+            markers=True,
+            render_mode=scatter_render_mode(len(rate_data)),
+            title="Detection Rate by Hour",
+            labels={'detection_rate': 'Observations per Survey Hour', 'start_hour': 'Survey Start Hour'},
+            color_discrete_sequence=['#636EFA']
+        )
+    show_chart('detection_rate', fig)
 
 # Spatial analysis: Biodiversity hotspots (Top 10 plots)
-st.subheader("Top 10 Biodiversity Hotspots (Plots)")
-if 'plot_name' in filtered_data.columns and 'scientific_name' in filtered_data.columns:
-    plot_data = filtered_data.groupby(['plot_name', 'common_name'])['scientific_name'].nunique().reset_index()
-    plot_data = plot_data.sort_values(by='scientific_name', ascending=False).head(10)
-    if species:
+@section("Top 10 Biodiversity Hotspots (Plots)", cuboid='plot_species', default_open=True)
+def hotspots_section(view):
+    """
+    Draw the ten plots with the most species.
+    """
+    if view['species']:
+        plot_data = species_richness(view['filter_key'], ('plot_name', 'common_name'), top=10)
         # Highlight selected species in the plot
         fig = px.bar(
             plot_data,
@@ -96,25 +494,114 @@ if 'plot_name' in filtered_data.columns and 'scientific_name' in filtered_data.c
             color_discrete_sequence=px.colors.qualitative.Set2
         )
     else:
-        # General plot without species differentiation
-        plot_data = filtered_data.groupby('plot_name')['scientific_name'].nunique().reset_index()
-        plot_data = plot_data.sort_values(by='scientific_name', ascending=False).head(10)
+        # General plot without species differentiation, read from the location rollup
+        plot_data = level_table(location_tree(view['filter_key']), 'plot_name')
+        plot_data = plot_data.sort_values('richness', ascending=False, kind='stable').head(10)
         fig = px.bar(
             plot_data,
-            x='scientific_name',
+            x='richness',
             y='plot_name',
             orientation='h',
             title="Top 10 Biodiversity Hotspots",
-            labels={'scientific_name': 'Number of Unique Species', 'plot_name': 'Plot Name'},
+            labels={'richness': 'Number of Unique Species', 'plot_name': 'Plot Name'},
             color_discrete_sequence=['#636EFA']
         )
-    st.plotly_chart(fig)
+    show_chart('hotspots', fig)
+
+# Spatial analysis: Drill-down from habitats to admin units and plots
+@section("Habitat, Admin Unit and Plot Drill-down", cuboid='plot_species')
+def drill_down_section(view):
+    """
+    Draw the location hierarchy as a treemap or sunburst (click a node to drill into it)
+    and the children and species of a chosen habitat or admin unit.
+    """
+    tree = location_tree(view['filter_key'])
+    nodes = tree['nodes']
+    if nodes.empty:
+        st.info("No observations match the current filters.")
+        return
+    chart = st.radio("Chart", ["Treemap", "Sunburst"], horizontal=True, key='drill_down_chart')
+    draw = px.treemap if chart == "Treemap" else px.sunburst
+    fig = draw(
+        nodes,
+        ids='id',
+        names='label',
+        parents='parent',
+        values='observations',
+        color='richness',
+        branchvalues='total',
+        hover_data=['richness'],
+        maxdepth=3,
+        title="Observations by Habitat, Admin Unit and Plot",
+        color_continuous_scale='Viridis'
+    )
+    show_chart('drill_down', fig)
+
+    # Drill into one node: its children and species come from the precomputed tree
+    inner = nodes[nodes['depth'] < nodes['depth'].max()]
+    node = st.selectbox("Drill into", inner['id'], key='drill_down_node',
+                        format_func=lambda node_id: "All habitats" if node_id == ROOT else node_id.split("/", 1)[1])
+    child_data = children(tree, node)
+    st.dataframe(child_data[['label', 'observations', 'richness']].rename(columns={'label': child_data['level'].iloc[0]}),
+                 hide_index=True)
+    st.dataframe(node_species(tree, node).head(view['chart_policy']['plot']['top_n']).reset_index(), hide_index=True)
+
+# Species diversity: Shannon, Simpson and Chao1 per habitat and plot
+@section("Diversity Indices", cuboid='plot_species')
+def diversity_section(view):
+    """
+    Draw the diversity indices of each habitat and the ten most diverse plots.
+    """
+    diversity_data = diversity(view['filter_key'])
+    index_columns = ['unit', 'observations', 'richness', 'shannon', 'simpson', 'chao1']
+    st.dataframe(diversity_data.loc[diversity_data['level'] == 'habitat', index_columns], hide_index=True)
+    plot_data = diversity_data[diversity_data['level'] == 'plot'].nlargest(10, 'shannon')
+    fig = px.bar(
+        plot_data,
+        x='shannon',
+        y='unit',
+        orientation='h',
+        hover_data=['richness', 'simpson', 'chao1'],
+        title="Top 10 Plots by Shannon Diversity",
+        labels={'shannon': 'Shannon Index', 'unit': 'Plot Name'},
+        color_discrete_sequence=['#636EFA']
+    )
+    show_chart('diversity', fig)
+
+# Beta diversity: plots with the most similar species composition
+@section("Plot Similarity", cuboid='plot_species')
+def similarity_section(view):
+    """
+    Draw the plots whose species composition is closest to a chosen plot.
+    """
+    _, plots = plot_species_matrix(view['filter_key'])
+    if len(plots) < 2:
+        st.info("At least two plots are needed to compare species composition.")
+        return
+    plot = st.selectbox("Plot", plots.astype(str), key='similarity_plot')
+    metric = st.radio("Dissimilarity", METRICS, horizontal=True, key='similarity_metric',
+                      format_func=lambda name: name.replace('_', '-').title())
+    similar_data = similar_plots(view['filter_key'], plot, metric, 10)
+    fig = px.bar(
+        similar_data,
+        x='similarity',
+        y='plot_name',
+        orientation='h',
+        title=f"Plots Most Similar to {plot}",
+        labels={'similarity': 'Similarity (1 - Dissimilarity)', 'plot_name': 'Plot Name'},
+        color_discrete_sequence=['#636EFA']
+    )
+    fig.update_yaxes(autorange='reversed')
+    show_chart('plot_similarity', fig)
 
 # Distance analysis
-st.subheader("Distance Analysis")
-if 'distance' in filtered_data.columns:
-    distance_data = filtered_data['distance'].value_counts().reset_index()
-    distance_data.columns = ['distance', 'count']
+@section("Distance Analysis", cuboid='distance')
+def distance_section(view):
+    """
+    Draw the observation counts per distance band.
+    """
+    distance_data = apply_policy(value_counts(view['filter_key'], 'distance', 'distance'), 'distance', 'count',
+                                 view['chart_policy']['distance'])
     fig = px.bar(
         distance_data,
         x='distance',
@@ -123,13 +610,15 @@ if 'distance' in filtered_data.columns:
         labels={'count': 'Number of Observations', 'distance': 'Distance'},
         color_discrete_sequence=['#AB63FA']
     )
-    st.plotly_chart(fig)
+    show_chart('distance', fig)
 
 # Flyover frequency
-st.subheader("Flyover Frequency")
-if 'flyover_observed' in filtered_data.columns:
-    flyover_data = filtered_data['flyover_observed'].value_counts().reset_index()
-    flyover_data.columns = ['flyover_observed', 'count']
+@section("Flyover Frequency", cuboid='flyover')
+def flyover_section(view):
+    """
+    Draw the share of flyover observations.
+    """
+    flyover_data = value_counts(view['filter_key'], 'flyover', 'flyover_observed')
     fig = px.pie(
         flyover_data,
         names='flyover_observed',
@@ -137,12 +626,15 @@ if 'flyover_observed' in filtered_data.columns:
         title="Flyover Frequency",
         color_discrete_sequence=px.colors.qualitative.Pastel
     )
-    st.plotly_chart(fig)
+    show_chart('flyover', fig)
 
 # Weather correlation: Sky and Wind
-st.subheader("Weather Correlation")
-if 'sky' in filtered_data.columns and 'wind' in filtered_data.columns:
-    weather_data = filtered_data.groupby(['sky', 'wind']).size().reset_index(name='observation_count')
+@section("Weather Correlation", cuboid='weather')
+def weather_section(view):
+    """
+    Draw the observation counts per sky and wind condition.
+    """
+    weather_data = observation_counts(view['filter_key'], 'weather', ('sky', 'wind'))
     fig = px.bar(
         weather_data,
         x='sky',
@@ -153,13 +645,15 @@ if 'sky' in filtered_data.columns and 'wind' in filtered_data.columns:
         barmode='group',
         color_discrete_sequence=px.colors.qualitative.Set2
     )
-    st.plotly_chart(fig)
+    show_chart('weather', fig)
 
 # Visit patterns
-st.subheader("Visit Patterns")
-if 'visit' in filtered_data.columns:
-    visit_data = filtered_data['visit'].value_counts().reset_index()
-    visit_data.columns = ['visit', 'count']
+@section("Visit Patterns", cuboid='visit')
+def visit_section(view):
+    """
+    Draw the observation counts per visit.
+    """
+    visit_data = value_counts(view['filter_key'], 'visit', 'visit')
     fig = px.bar(
         visit_data,
         x='visit',
@@ -168,13 +662,16 @@ if 'visit' in filtered_data.columns:
         labels={'count': 'Number of Observations', 'visit': 'Visit Count'},
         color_discrete_sequence=['#FFA15A']
     )
-    st.plotly_chart(fig)
+    show_chart('visit', fig)
 
 # AOU Code patterns
-st.subheader("AOU Code Patterns")
-if 'aou_code' in filtered_data.columns:
-    aou_data = filtered_data['aou_code'].value_counts().reset_index()
-    aou_data.columns = ['aou_code', 'count']
+@section("AOU Code Patterns", cuboid='aou_code')
+def aou_code_section(view):
+    """
+    Draw the observation counts per AOU code.
+    """
+    aou_data = apply_policy(value_counts(view['filter_key'], 'aou_code', 'aou_code'), 'aou_code', 'count',
+                            view['chart_policy']['aou_code'])
     fig = px.bar(
         aou_data,
         x='aou_code',
@@ -183,13 +680,17 @@ if 'aou_code' in filtered_data.columns:
         labels={'count': 'Number of Observations', 'aou_code': 'AOU Code'},
         color_discrete_sequence=['#19D3F3']
     )
-    st.plotly_chart(fig)
+    show_chart('aou_code', fig)
 
 # Spatial analysis: Observations by Admin Unit
-st.subheader("Observations by Administrative Unit")
-if 'admin_unit_code' in filtered_data.columns:
-    admin_data = filtered_data['admin_unit_code'].value_counts().reset_index()
-    admin_data.columns = ['admin_unit_code', 'observation_count']
+@section("Observations by Administrative Unit", cuboid='plot_species')
+def admin_unit_section(view):
+    """
+    Draw the observation counts per administrative unit.
+    """
+    admin_data = level_table(location_tree(view['filter_key']), 'admin_unit_code')
+    admin_data = admin_data.rename(columns={'observations': 'observation_count'})
+    admin_data = admin_data.sort_values('observation_count', ascending=False, kind='stable')
     fig = px.bar(
         admin_data,
         x='admin_unit_code',
@@ -198,13 +699,18 @@ if 'admin_unit_code' in filtered_data.columns:
         labels={'observation_count': 'Number of Observations', 'admin_unit_code': 'Administrative Unit'},
         color_discrete_sequence=['#636EFA']
     )
-    st.plotly_chart(fig)
+    show_chart('admin_unit', fig)
 
 # Spatial analysis: Observations by Plot
-st.subheader("Observations by Plot")
-if 'plot_name' in filtered_data.columns:
-    plot_data = filtered_data['plot_name'].value_counts().reset_index()
-    plot_data.columns = ['plot_name', 'observation_count']
+@section("Observations by Plot", cuboid='plot_species')
+def plot_section(view):
+    """
+    Draw the observation counts per plot.
+    """
+    plot_data = level_table(location_tree(view['filter_key']), 'plot_name')
+    plot_data = plot_data.rename(columns={'observations': 'observation_count'})
+    plot_data = plot_data.sort_values('observation_count', ascending=False, kind='stable')
+    plot_data = apply_policy(plot_data, 'plot_name', 'observation_count', view['chart_policy']['plot'])
     fig = px.bar(
         plot_data,
         x='observation_count',
@@ -214,4 +720,10 @@ if 'plot_name' in filtered_data.columns:
         labels={'observation_count': 'Number of Observations', 'plot_name': 'Plot Name'},
         color_discrete_sequence=['#EF553B']
     )
-    st.plotly_chart(fig)
+    show_chart('plot', fig)
+
+# Render the open sections for the current filters, once the dataset is loaded
+if not dataset_loaded():
+    with st.spinner("Loading the dataset..."):
+        bundle(version)
+render_sections({'filter_key': filter_key, 'species': species, 'chart_policy': chart_policy})
@@ -0,0 +1,54 @@
+# bench_biodiversity.py
+"""
+Benchmark the biodiversity metrics on synthetic observations with growing numbers of plots.
+
+Run from the project root:
+    python benchmarks/bench_biodiversity.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scritpts"))
+from biodiversity import abundance_matrix, biodiversity_table, bootstrap_rarefaction, rarefaction
+
+# Shape of the real data: ~25 observations per plot over ~130 species in 11 admin units
+OBSERVATIONS_PER_PLOT = 25
+SPECIES = 130
+ADMIN_UNITS = 11
+
+def synthetic_observations(plots, seed=0):
+    """
+    Generate observations with a skewed (Zipf-like) species distribution, like real surveys.
+    """
+    rng = np.random.default_rng(seed)
+    rows = plots * OBSERVATIONS_PER_PLOT
+    plot = rng.integers(0, plots, rows)
+    weights = 1 / np.arange(1, SPECIES + 1)
+    species = rng.choice(SPECIES, size=rows, p=weights / weights.sum())
+    return pd.DataFrame({
+        'plot_name': pd.Categorical(plot),
+        'scientific_name': pd.Categorical(species),
+        'admin_unit_code': pd.Categorical(plot % ADMIN_UNITS),
+        'location_type': pd.Categorical(np.where(plot % 2, "Forest", "Grassland")),
+    })
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+if __name__ == "__main__":
+    depths = [1, 5, 10, 20]
+    for plots in (1_000, 10_000, 50_000):
+        data = synthetic_observations(plots)
+        matrix_time, (matrix, _, _) = timed(abundance_matrix, data)
+        table_time, table = timed(biodiversity_table, data)
+        analytic_time, _ = timed(rarefaction, matrix, depths)
+        bootstrap_time, _ = timed(bootstrap_rarefaction, matrix, depths, iterations=50)
+        print(f"plots={plots:>6} rows={len(data):>8}  matrix={matrix_time * 1000:7.1f} ms  "
+              f"indices={table_time * 1000:7.1f} ms ({len(table)} units)  "
+              f"rarefaction={analytic_time * 1000:7.1f} ms  bootstrap={bootstrap_time * 1000:8.1f} ms")
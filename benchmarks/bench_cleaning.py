@@ -0,0 +1,70 @@
+# bench_cleaning.py
+"""
+Benchmark clean_data against the step-by-step cleaning it replaced, on the real workbooks.
+
+Run from the project root:
+    python benchmarks/bench_cleaning.py
+"""
+import logging
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scritpts"))
+from data_preprocessing import (
+    OUTLIER_COLUMNS,
+    clean_data,
+    handle_missing_values,
+    load_data,
+    remove_duplicates,
+    remove_outliers,
+    standardize_column_names,
+    validate_data_types,
+)
+from temporal import add_time_of_day
+
+def stepwise_clean_data(data):
+    """
+    Reference cleaning: one full pass (and copy) per step and per outlier column.
+    """
+    data = standardize_column_names(data)
+    data = remove_duplicates(data)
+    data = handle_missing_values(data)
+    for column in OUTLIER_COLUMNS:
+        data = remove_outliers(data, column)
+    data = validate_data_types(data)
+    if 'date' in data.columns:
+        data['year'] = data['date'].dt.year
+        data['month'] = data['date'].dt.month
+    return add_time_of_day(data)
+
+def best_of(function, data, repeat):
+    """
+    Return the fastest wall time of `repeat` runs and the last result.
+    """
+    timings = []
+    for _ in range(repeat):
+        copy = data.copy()
+        start = time.perf_counter()
+        result = function(copy)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    forest_file = os.path.join("data", "Bird_Monitoring_Data_FOREST.XLSX")
+    grassland_file = os.path.join("data", "Bird_Monitoring_Data_GRASSLAND.XLSX")
+    forest_data, grassland_data = load_data(forest_file, grassland_file)
+
+    for name, data in (("forest", forest_data), ("grassland", grassland_data)):
+        for scale in (1, 10):
+            scaled = pd.concat([data] * scale, ignore_index=True)
+            # Perturb the copies so they are not all removed as duplicates
+            scaled['Visit'] = scaled['Visit'] + scaled.index // len(data) * 10
+            stepwise_time, expected = best_of(stepwise_clean_data, scaled, repeat=5)
+            fused_time, result = best_of(clean_data, scaled, repeat=5)
+            pd.testing.assert_frame_equal(expected, result)
+            print(f"{name:<10} x{scale:<3} rows={len(scaled):>7}  stepwise={stepwise_time * 1000:8.1f} ms  "
+                  f"fused={fused_time * 1000:8.1f} ms  speedup={stepwise_time / fused_time:4.2f}x")
@@ -0,0 +1,124 @@
+# bench_scaling.py
+"""
+Benchmark the pipeline and the dashboard aggregations on synthetic data at growing scales.
+
+Each scale runs in a fresh process, so the peak memory of one scale does not hide the
+next. Every step is measured as a profiling stage (wall time, CPU time, growth of the
+process's peak RSS, rows in and out); with --output the records are appended as JSON
+lines, one per step, so runs can be compared over time.
+
+Run from the project root:
+    python benchmarks/bench_scaling.py --scales 1 10 100 --output benchmarks/results.jsonl
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scritpts"))
+from analytics import cell_detection_rates, count_by, richness, total, value_table
+from beta_diversity import nearest_plots, plot_matrix
+from biodiversity import biodiversity_table
+from cube import build_cube, index_cube, slice_cuboid
+from data_preprocessing import clean_data, merge_datasets, save_cleaned_data
+from dataset import read_compact
+from hierarchy import level_table, rollup_tree
+from profiling import peak_rss_bytes, stage, stage_records
+from synthetic import synthetic_workbooks
+from temporal import hour_of_day, survey_effort
+
+# Filters applied in the filtered dashboard steps, as a user narrowing to one habitat and observer
+FILTERS = {'location_type': ['Forest'], 'observer': ['Kimberly Serno']}
+
+def run_pipeline(scale, output_dir):
+    """
+    Generate, clean, merge and save one scale of synthetic data; return the cleaned dataset path.
+    """
+    with stage('generate') as record:
+        forest_data, grassland_data = synthetic_workbooks(scale)
+        record['rows_out'] = len(forest_data) + len(grassland_data)
+    forest_data = clean_data(forest_data)
+    grassland_data = clean_data(grassland_data)
+    combined_data = merge_datasets(forest_data, grassland_data)
+    output_path = os.path.join(output_dir, "cleaned_bird_data")
+    save_cleaned_data(combined_data, output_path)
+    return output_path
+
+def run_dashboard(path):
+    """
+    Load the cleaned dataset and run the dashboard's aggregations, unfiltered and filtered.
+    """
+    with stage('load') as record:
+        data = read_compact(path)
+        data = data.assign(start_hour=hour_of_day(data['start_seconds']).astype('Int8'))
+        record['rows_out'] = len(data)
+    with stage('build_cube', rows_in=len(data)) as record:
+        cube = build_cube(data)
+        index = index_cube(cube)
+        record['rows_out'] = sum(len(cells) for cells in cube.values())
+    with stage('survey_effort', rows_in=len(data)) as record:
+        effort = survey_effort(data, ['location_type', 'observer'])
+        record['rows_out'] = len(effort)
+
+    for label, filters in (('all', {}), ('filtered', FILTERS)):
+        with stage(f'key_metrics.{label}'):
+            species_cells = slice_cuboid(cube, 'species', filters, index)
+            total(species_cells, 'count'), species_cells['scientific_name'].nunique()
+        with stage(f'monthly_counts.{label}'):
+            count_by(slice_cuboid(cube, 'month', filters, index), ['month'], weight='count')
+        with stage(f'value_counts.{label}'):
+            value_table(slice_cuboid(cube, 'aou_code', filters, index), 'aou_code', weight='count')
+        with stage(f'hotspots.{label}'):
+            richness(slice_cuboid(cube, 'plot_species', filters, index), ['plot_name'], 10)
+        with stage(f'location_tree.{label}'):
+            tree = rollup_tree(slice_cuboid(cube, 'plot_species', filters, index), weight='count')
+            level_table(tree, 'admin_unit_code'), level_table(tree, 'plot_name')
+        with stage(f'diversity.{label}'):
+            biodiversity_table(slice_cuboid(cube, 'plot_species', filters, index), weight='count')
+        with stage(f'plot_similarity.{label}'):
+            matrix, plots = plot_matrix(slice_cuboid(cube, 'plot_species', filters, index), weight='count')
+            if len(plots) > 1:
+                nearest_plots(matrix, plots, plots[0], 10, 'bray_curtis')
+        with stage(f'detection_rate.{label}'):
+            cell_detection_rates(slice_cuboid(cube, 'hour', filters, index), effort, filters)
+
+def run_scale(scale):
+    """
+    Run every benchmark step at one scale and return the stage records and the process's peak RSS.
+    """
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as output_dir:
+        with stage('pipeline'):
+            path = run_pipeline(scale, output_dir)
+        with stage('dashboard'):
+            run_dashboard(path)
+    return stage_records(), peak_rss_bytes()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline and dashboard aggregations at growing scales.")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="multiples of the real data volume (number of plots) to benchmark")
+    parser.add_argument("--output", default=None, help="append the stage records to this JSON lines file")
+    args = parser.parse_args()
+
+    run_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+    context = multiprocessing.get_context('spawn')
+    for scale in args.scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            records, peak = executor.submit(run_scale, scale).result()
+
+        print(f"scale x{scale:g}  (peak RSS {peak / 2**20:.0f} MiB)")
+        print(f"  {'stage':<44} {'wall ms':>10} {'cpu ms':>10} {'peak +MiB':>10} {'rows in':>10} {'rows out':>10}")
+        for record in records:
+            print(f"  {record['stage']:<44} {record['wall_seconds'] * 1000:10.1f} {record['cpu_seconds'] * 1000:10.1f} "
+                  f"{record['process_peak_rss_delta_mb'] or 0:10.1f} {record['rows_in'] or '':>10} {record['rows_out'] or '':>10}")
+
+        if args.output:
+            with open(args.output, "a") as handle:
+                for record in records:
+                    handle.write(json.dumps({'run_at': run_at, 'scale': scale, 'peak_rss_mb': peak / 2**20, **record}) + "\n")
@@ -0,0 +1,162 @@
+# synthetic.py
+"""
+Generate synthetic bird monitoring sheets with the schema and cardinalities of the real workbooks.
+
+The frames look like load_data's output (raw column names, one frame per habitat), so
+they go through clean_data and merge_datasets like the real data. `scale` multiplies the
+number of plots, and with them surveys and observations; admin units, species, observers
+and the weather and protocol vocabularies keep their real sizes (see insights.txt).
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+SURVEY_YEAR = 2018
+SURVEY_START = pd.Timestamp(f"{SURVEY_YEAR}-05-07")
+SURVEY_DAYS = 74
+
+# Observations per admin unit in the real workbooks; plots are spread over units in these proportions
+FOREST_UNITS = {'PRWI': 2463, 'CHOH': 2202, 'CATO': 805, 'NACE': 684, 'MANA': 465, 'HAFE': 422,
+                'GWMP': 386, 'MONO': 370, 'ANTI': 333, 'ROCR': 289, 'WOTR': 127}
+GRASSLAND_UNITS = {'ANTI': 3588, 'MONO': 3015, 'MANA': 1811, 'HAFE': 117}
+
+# Per-habitat shape of the real data at scale 1
+HABITATS = {
+    'Forest': {'units': FOREST_UNITS, 'plots': 408, 'visits': 2, 'species': slice(0, 108),
+               'temperature': (22.0, 3.5), 'duplicates': 0.0},
+    'Grassland': {'units': GRASSLAND_UNITS, 'plots': 201, 'visits': 3, 'species': slice(20, 127),
+                  'temperature': (25.5, 4.0), 'duplicates': 0.2},
+}
+
+SPECIES = 127
+OBSERVATIONS_PER_SURVEY = 12
+SURVEY_MINUTES = 10
+OBSERVERS = ['Elizabeth Oswald', 'Kimberly Serno', 'Brian Swimelar']
+
+# Vocabularies with their real frequencies
+SKY = {'Partly Cloudy': 6137, 'Clear or Few Clouds': 5272, 'Cloudy/Overcast': 2880, 'Fog': 598, 'Mist/Drizzle': 352}
+WIND = {'Light air movement (1-3 mph) smoke drifts': 7569, 'Calm (< 1 mph) smoke rises vertically': 4196,
+        'Light breeze (4-7 mph) wind felt on face': 3109, 'Gentle breeze (8-12 mph), leaves in motion': 365}
+ID_METHODS = {'Singing': 13971, 'Calling': 5292, 'Visualization': 4504}
+DISTANCES = {'50 - 100 Meters': 7713, '<= 50 Meters': 6841, None: 1486}
+SEXES = {'Undetermined': 8410, 'Male': 3338, 'Female': 146, None: 5183}
+INTERVALS = {'0-2.5 min': 4410, '2.5 - 5 min': 1722, '5 - 7.5 min': 1295, '7.5 - 10 min': 1119}
+DISTURBANCES = {'No effect on count': 8029, 'Slight effect on count': 6750,
+                'Moderate effect on count': 1819, 'Serious effect on count': 479}
+SUB_UNITS = ['PISC', 'GREE', 'FODU', 'FOWA', 'FOCI', 'THIS', 'OXHI', 'ANAC']
+
+# Every minute of the day as the datetime.time objects the workbook reader returns
+_TIMES = np.array([datetime.time(minute // 60, minute % 60) for minute in range(24 * 60)], dtype=object)
+
+def _choice(rng, frequencies, size):
+    """
+    Draw `size` values with the given {value: frequency} proportions, as an object array.
+    """
+    values = np.array(list(frequencies), dtype=object)
+    weights = np.array(list(frequencies.values()), dtype=float)
+    return values[rng.choice(len(values), size=size, p=weights / weights.sum())]
+
+def species_table():
+    """
+    The synthetic species list: names, codes and conservation flags, one row per species.
+    """
+    ids = np.arange(SPECIES)
+    return pd.DataFrame({
+        'Common_Name': [f"Species {i:03d}" for i in ids],
+        'Scientific_Name': [f"Genus{i // 4:02d} species{i:03d}" for i in ids],
+        'AOU_Code': [f"S{i:03d}" for i in ids],
+        'AcceptedTSN': (170000 + ids * 7).astype(float),
+        'TaxonCode': 80000 + ids * 3,
+        'PIF_Watchlist_Status': ids % 9 == 0,
+        'Regional_Stewardship_Status': ids % 3 == 0,
+    })
+
+def synthetic_habitat(location_type, scale=1, seed=0):
+    """
+    Generate one habitat's observations, like load_data's frame for that workbook.
+
+    Plots belong to admin units; each plot is surveyed once per visit on a date with a
+    start time, observer and weather shared by all of that survey's observations, and
+    species follow a skewed (Zipf-like) distribution as in real counts.
+    """
+    shape = HABITATS[location_type]
+    rng = np.random.default_rng([seed, list(HABITATS).index(location_type)])
+
+    # Plots and their admin units; the habitat's initial keeps plot names unique across habitats,
+    # as every plot lies in exactly one habitat and admin unit
+    plots = max(1, int(round(shape['plots'] * scale)))
+    units = _choice(rng, shape['units'], plots)
+    plot_names = np.array([f"{unit}-{location_type[0]}{i:04d}" for i, unit in enumerate(units)], dtype=object)
+    site_names = np.array([f"{unit} {i % 7 + 1}" for i, unit in enumerate(units)], dtype=object)
+
+    # Surveys: one per plot and visit, later visits later in the season
+    visits = shape['visits']
+    survey_plot = np.repeat(np.arange(plots), visits)
+    survey_visit = np.tile(np.arange(1, visits + 1), plots)
+    window = SURVEY_DAYS // visits
+    survey_day = (survey_visit - 1) * window + rng.integers(0, window, len(survey_plot))
+    survey_start = rng.integers(5 * 60 + 30, 10 * 60, len(survey_plot))
+    surveys = len(survey_plot)
+
+    # Observations, 12 per survey on average
+    per_survey = rng.poisson(OBSERVATIONS_PER_SURVEY, surveys)
+    survey = np.repeat(np.arange(surveys), per_survey)
+    rows = len(survey)
+    plot = survey_plot[survey]
+
+    pool = np.arange(SPECIES)[shape['species']]
+    weights = 1 / np.arange(1, len(pool) + 1)
+    species = species_table().iloc[pool[rng.choice(len(pool), size=rows, p=weights / weights.sum())]]
+
+    mean, std = shape['temperature']
+    temperature = np.round(rng.normal(mean, std, surveys).clip(11, 37.3), 1)[survey]
+    humidity = np.round(rng.normal(78, 11, surveys).clip(33, 98.8), 1)[survey]
+
+    data = pd.DataFrame({
+        'Admin_Unit_Code': units[plot],
+        'Sub_Unit_Code': None,
+        'Site_Name': site_names[plot],
+        'Plot_Name': plot_names[plot],
+        'Location_Type': location_type,
+        'Year': SURVEY_YEAR,
+        'Date': (SURVEY_START + pd.to_timedelta(survey_day, unit='D'))[survey],
+        'Start_Time': _TIMES[survey_start][survey],
+        'End_Time': _TIMES[survey_start + SURVEY_MINUTES][survey],
+        'Observer': _choice(rng, dict.fromkeys(OBSERVERS, 1), surveys)[survey],
+        'Visit': survey_visit[survey],
+        'Interval_Length': _choice(rng, INTERVALS, rows),
+        'ID_Method': _choice(rng, ID_METHODS, rows),
+        'Distance': _choice(rng, DISTANCES, rows),
+        'Flyover_Observed': rng.random(rows) < 0.02,
+        'Sex': _choice(rng, SEXES, rows),
+        **{col: species[col].to_numpy() for col in ['Common_Name', 'Scientific_Name', 'AcceptedTSN']},
+        'TaxonCode': species['TaxonCode'].to_numpy(),
+        'AOU_Code': species['AOU_Code'].to_numpy(),
+        'PIF_Watchlist_Status': species['PIF_Watchlist_Status'].to_numpy(),
+        'Regional_Stewardship_Status': species['Regional_Stewardship_Status'].to_numpy(),
+        'Temperature': temperature,
+        'Humidity': humidity,
+        'Sky': _choice(rng, SKY, surveys)[survey],
+        'Wind': _choice(rng, WIND, surveys)[survey],
+        'Disturbance': _choice(rng, DISTURBANCES, surveys)[survey],
+        'Initial_Three_Min_Cnt': rng.random(rows) < 0.6,
+    })
+
+    # The two workbooks differ slightly in schema, which merge_datasets has to align
+    if location_type == 'Forest':
+        sub_units = rng.random(rows) < 0.08
+        data.loc[sub_units, 'Sub_Unit_Code'] = _choice(rng, dict.fromkeys(SUB_UNITS, 1), int(sub_units.sum()))
+        data = data.rename(columns={'TaxonCode': 'NPSTaxonCode'})
+    else:
+        data = data.drop(columns='Site_Name').assign(Previously_Obs=False)
+
+    # Repeated rows, as some sheets hold exact duplicates
+    duplicates = rng.choice(rows, size=int(rows * shape['duplicates']), replace=False)
+    return pd.concat([data, data.iloc[np.sort(duplicates)]], ignore_index=True)
+
+def synthetic_workbooks(scale=1, seed=0):
+    """
+    Generate the forest and grassland frames, like load_data on the real workbooks.
+    """
+    return synthetic_habitat('Forest', scale, seed), synthetic_habitat('Grassland', scale, seed)
@@ -0,0 +1,115 @@
+# analytics.py
+import numpy as np
+import pandas as pd
+
+from temporal import TIME_COLUMNS, detection_rates, hour_of_day, seconds_since_midnight
+
+# Season of each month (index 0 is unused), as the EDA defines them
+SEASONS = ['Winter', 'Spring', 'Summer', 'Fall']
+MONTH_SEASON = np.array([-1, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0])
+
+def season_of(months):
+    """
+    Map month numbers to a categorical season with one array lookup; missing months map to NaN.
+    """
+    months = pd.Series(months)
+    codes = MONTH_SEASON[months.fillna(0).astype(int).to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=SEASONS), index=months.index)
+
+def add_derived_features(data):
+    """
+    Add the derived columns used by the analyses (year, month, season, start/end hour).
+
+    Columns already present are kept, so calling this on prepared data costs nothing.
+    Returns a new DataFrame; the input is not modified.
+    """
+    derived = {}
+    if 'date' in data.columns:
+        if 'year' not in data.columns:
+            derived['year'] = data['date'].dt.year
+        if 'month' not in data.columns:
+            derived['month'] = data['date'].dt.month
+    months = derived.get('month', data['month'] if 'month' in data.columns else None)
+    if months is not None and 'season' not in data.columns:
+        derived['season'] = season_of(months)
+    for column, seconds_column in TIME_COLUMNS.items():
+        hour_column = column.replace('_time', '_hour')
+        if hour_column in data.columns:
+            continue
+        # Prefer the seconds parsed by the pipeline; parse the time column only as a fallback
+        if seconds_column in data.columns:
+            derived[hour_column] = hour_of_day(data[seconds_column])
+        elif column in data.columns:
+            derived[hour_column] = hour_of_day(seconds_since_midnight(data[column]))
+    return data.assign(**derived) if derived else data
+
+def total(data, weight=None):
+    """
+    Return the number of observations, i.e. rows or the sum of the `weight` column.
+    """
+    return len(data) if weight is None else int(data[weight].sum())
+
+def count_by(data, by, weight=None, name='observation_count'):
+    """
+    Count observations grouped by the given columns.
+
+    With `weight`, rows are pre-aggregated cells (such as cube cells) and their
+    `weight` column is summed instead of counting rows.
+    """
+    groups = data.groupby(by, observed=True)
+    counts = groups.size() if weight is None else groups[weight].sum()
+    return counts.reset_index(name=name)
+
+def value_table(data, column, weight=None, top=None):
+    """
+    Observation counts per value of a column, largest first, as a [column, 'count'] table.
+    """
+    table = count_by(data, column, weight, name='count').sort_values('count', ascending=False, kind='stable')
+    table = table[table['count'] > 0].reset_index(drop=True)
+    return table.head(top) if top is not None else table
+
+def distinct_count(data, by, column):
+    """
+    Count the distinct values of `column` grouped by the given columns.
+    """
+    return data.groupby(by, observed=True)[column].nunique().reset_index()
+
+def richness(data, by, top=None):
+    """
+    Number of distinct species per group; with `top`, only the richest groups, richest first.
+    """
+    table = distinct_count(data, by, 'scientific_name')
+    if top is not None:
+        table = table.sort_values('scientific_name', ascending=False, kind='stable').head(top)
+    return table
+
+def hour_counts(data, by=(), weight=None):
+    """
+    Observations per hour of day at the start and at the end of the survey interval.
+
+    Expects the 'start_hour' and 'end_hour' columns of add_derived_features; returns
+    one row per group and hour with 'start_count' and 'end_count' columns.
+    """
+    by = list(by)
+    counts = [
+        count_by(data, by + [f"{boundary}_hour"], weight, name=f"{boundary}_count")
+        .rename(columns={f"{boundary}_hour": 'hour'}).set_index(by + ['hour'])
+        for boundary in ['start', 'end']
+    ]
+    table = pd.concat(counts, axis=1).fillna(0).astype('int64').sort_index().reset_index()
+    return table.astype({'hour': 'int64'})
+
+def cell_detection_rates(cells, effort, filters, by=()):
+    """
+    Observations per survey hour for each start hour (and `by`) from filtered 'hour' cube cells.
+
+    `effort` comes from survey_effort; it is narrowed by the `filters` on the dimensions
+    it is grouped by and summed per start hour. Filters on other dimensions (such as
+    species) narrow the detections only, which the cells already reflect.
+    """
+    detections = count_by(cells, ['start_hour', *by], weight='count', name='detections')
+    for dimension, values in filters.items():
+        if values and dimension in effort.columns:
+            effort = effort[effort[dimension].isin(values)]
+    effort = effort.groupby('start_hour', observed=True)[['surveys', 'survey_minutes']].sum().reset_index()
+    return detection_rates(detections, effort)
@@ -0,0 +1,101 @@
+# beta_diversity.py
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from biodiversity import abundance_matrix
+
+METRICS = ['jaccard', 'bray_curtis']
+
+# Rows per block of the pairwise computation; a Bray-Curtis block holds
+# block_size x block_size x species floats, so memory stays bounded for any plot count
+DEFAULT_BLOCK_SIZE = 64
+
+def jaccard_block(a, b):
+    """
+    Jaccard dissimilarity between the rows of two sparse site x species matrices.
+
+    Presence is any positive abundance; shared species come from one sparse product
+    of the binary matrices. Two sites without any species have dissimilarity 0.
+    """
+    a, b = (sparse.csr_matrix(m, dtype=bool).astype(np.int64) for m in (a, b))
+    shared = (a @ b.T).toarray()
+    union = np.asarray(a.sum(axis=1)) + np.asarray(b.sum(axis=1)).T - shared
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, 1 - shared / union, 0.0)
+
+def bray_curtis_block(a, b, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Bray-Curtis dissimilarity between the rows of two sparse site x species matrices.
+
+    1 - 2 sum_i min(a_i, b_i) / (sum a + sum b), with the shared abundance summed by
+    np.minimum over dense sub-blocks of `block_size` rows of `b`. Two empty sites have
+    dissimilarity 0.
+    """
+    a, b = sparse.csr_matrix(a), sparse.csr_matrix(b)
+    dense_a = a.toarray().astype(np.float64)
+    shared = np.empty((a.shape[0], b.shape[0]))
+    for start in range(0, b.shape[0], block_size):
+        dense_b = b[start:start + block_size].toarray().astype(np.float64)
+        shared[:, start:start + block_size] = np.minimum(dense_a[:, None, :], dense_b[None, :, :]).sum(axis=2)
+    totals = np.asarray(a.sum(axis=1), dtype=np.float64) + np.asarray(b.sum(axis=1), dtype=np.float64).T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, 1 - 2 * shared / totals, 0.0)
+
+def dissimilarity_block(a, b, metric='jaccard', block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Dissimilarity between the rows of `a` and the rows of `b` with the given metric.
+    """
+    if metric == 'jaccard':
+        return jaccard_block(a, b)
+    if metric == 'bray_curtis':
+        return bray_curtis_block(a, b, block_size)
+    raise ValueError(f"Unknown metric {metric!r}; expected one of {METRICS}")
+
+def iter_dissimilarity_blocks(matrix, metric='jaccard', block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Yield (start, block) pairs covering the pairwise dissimilarity matrix, `block_size` rows at a time.
+
+    Each block holds the dissimilarities of rows start..start + block_size against every
+    row, so callers can reduce or write out a matrix too large to keep in memory.
+    """
+    matrix = sparse.csr_matrix(matrix)
+    for start in range(0, matrix.shape[0], block_size):
+        yield start, dissimilarity_block(matrix[start:start + block_size], matrix, metric, block_size)
+
+def dissimilarity_matrix(matrix, metric='jaccard', block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Full pairwise dissimilarity matrix of the rows of a site x species matrix, built block by block.
+    """
+    n = matrix.shape[0]
+    result = np.empty((n, n))
+    for start, block in iter_dissimilarity_blocks(matrix, metric, block_size):
+        result[start:start + len(block)] = block
+    return result
+
+def plot_matrix(data, weight=None):
+    """
+    Build the plot x species abundance matrix of the cleaned observations (see biodiversity.abundance_matrix).
+    """
+    matrix, plots, _ = abundance_matrix(data, 'plot_name', 'scientific_name', weight)
+    return matrix, plots
+
+def nearest_plots(matrix, plots, plot, k=10, metric='jaccard'):
+    """
+    Return the `k` plots most similar to `plot`, most similar first.
+
+    Only the row of `plot` is compared against every plot, so a query costs one block.
+    Returns a DataFrame with plot_name, dissimilarity and similarity (1 - dissimilarity).
+    Raises KeyError if `plot` is not in `plots`.
+    """
+    position = plots.get_loc(plot)
+    distances = dissimilarity_block(sparse.csr_matrix(matrix)[position], matrix, metric)[0]
+    distances[position] = np.inf
+    k = min(k, len(plots) - 1)
+    nearest = np.argpartition(distances, k)[:k]
+    nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+    return pd.DataFrame({
+        'plot_name': plots[nearest].astype(str),
+        'dissimilarity': distances[nearest],
+        'similarity': 1 - distances[nearest],
+    })
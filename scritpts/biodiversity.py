@@ -0,0 +1,182 @@
+# biodiversity.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import gammaln
+
+# Levels diversity is reported at: level name -> column naming its units. Plots nest
+# in admin units and habitats, so higher levels are sums of plot rows.
+LEVELS = {
+    'plot': 'plot_name',
+    'admin_unit': 'admin_unit_code',
+    'habitat': 'location_type',
+}
+
+def abundance_matrix(data, site='plot_name', species='scientific_name', weight=None):
+    """
+    Build a sparse site x species abundance matrix.
+
+    Every row of `data` is one observation; with `weight`, rows are pre-aggregated
+    cells (such as cube cells) and their `weight` column is the abundance instead.
+    Returns (CSR matrix, site labels, species labels); rows missing either label are ignored.
+    """
+    site_codes, sites = pd.factorize(data[site], sort=True)
+    species_codes, species_names = pd.factorize(data[species], sort=True)
+    valid = (site_codes >= 0) & (species_codes >= 0)
+    values = np.ones(valid.sum(), dtype=np.int64) if weight is None else data[weight].to_numpy(dtype=np.int64)[valid]
+    matrix = sparse.coo_matrix(
+        (values, (site_codes[valid], species_codes[valid])),
+        shape=(len(sites), len(species_names)),
+    ).tocsr()
+    matrix.sum_duplicates()
+    matrix.eliminate_zeros()
+    return matrix, pd.Index(sites, name=site), pd.Index(species_names, name=species)
+
+def indicator_matrix(data, site, group, sites):
+    """
+    Return a sparse group x site matrix with a 1 where a site belongs to a group, and the group labels.
+
+    Multiplying it with a site x species matrix sums the sites of each group.
+    """
+    pairs = data[[site, group]].dropna().drop_duplicates(site)
+    group_codes, groups = pd.factorize(pairs[group], sort=True)
+    site_codes = sites.get_indexer(pairs[site])
+    indicator = sparse.coo_matrix(
+        (np.ones(len(pairs), dtype=np.int64), (group_codes, site_codes)),
+        shape=(len(groups), len(sites)),
+    ).tocsr()
+    return indicator, pd.Index(groups, name=group)
+
+def _row_ids(matrix):
+    """
+    Row number of every stored value of a CSR matrix.
+    """
+    return np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+
+def diversity_indices(matrix):
+    """
+    Compute abundance-based diversity indices for every row of a site x species matrix at once.
+
+    Returns a DataFrame with, per row: observations (N), richness (S), Shannon entropy
+    (natural log), Gini-Simpson (1 - sum p^2) and the bias-corrected Chao1 estimate
+    S + F1(F1 - 1) / (2(F2 + 1)), where F1 and F2 count singleton and doubleton species.
+    """
+    matrix = sparse.csr_matrix(matrix)
+    rows, n_rows = _row_ids(matrix), matrix.shape[0]
+    counts = matrix.data.astype(np.float64)
+    totals = np.bincount(rows, weights=counts, minlength=n_rows)
+    richness = np.diff(matrix.indptr)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = counts / totals[rows]
+        shannon = np.bincount(rows, weights=-p * np.log(p), minlength=n_rows)
+        simpson = 1 - np.bincount(rows, weights=p * p, minlength=n_rows)
+    singletons = np.bincount(rows, weights=counts == 1, minlength=n_rows)
+    doubletons = np.bincount(rows, weights=counts == 2, minlength=n_rows)
+    chao1 = richness + singletons * (singletons - 1) / (2 * (doubletons + 1))
+
+    empty = totals == 0
+    return pd.DataFrame({
+        'observations': totals.astype(np.int64),
+        'richness': richness,
+        'shannon': np.where(empty, np.nan, shannon),
+        'simpson': np.where(empty, np.nan, simpson),
+        'chao1': chao1,
+    })
+
+def biodiversity_table(data, levels=LEVELS, site='plot_name', weight=None):
+    """
+    Diversity indices of every unit of every level, from one site x species matrix.
+
+    The matrix is built once at the `site` level; each other level is rolled up from it
+    with an indicator matrix product, and the indices of all levels are computed in one
+    vectorized pass over the stacked matrix. Returns one row per (level, unit).
+    """
+    matrix, sites, _ = abundance_matrix(data, site, weight=weight)
+    blocks, labels = [], []
+    for level, column in levels.items():
+        if column not in data.columns:
+            continue
+        if column == site:
+            blocks.append(matrix)
+            units = sites
+        else:
+            indicator, units = indicator_matrix(data, site, column, sites)
+            blocks.append(indicator @ matrix)
+        labels.append(pd.DataFrame({'level': level, 'unit': units.astype(str)}))
+    table = diversity_indices(sparse.vstack(blocks, format='csr'))
+    return pd.concat([pd.concat(labels, ignore_index=True), table], axis=1)
+
+def rarefaction(matrix, depths):
+    """
+    Expected richness of every row at each sampling depth (Hurlbert's analytic rarefaction).
+
+    E[S_n] = sum_i 1 - C(N - N_i, n) / C(N, n), evaluated with log-gamma for all stored
+    values and depths at once. Depths above a row's total are NaN. Returns a
+    rows x depths array.
+    """
+    matrix = sparse.csr_matrix(matrix)
+    depths = np.asarray(depths, dtype=np.float64)
+    rows, n_rows = _row_ids(matrix), matrix.shape[0]
+    counts = matrix.data.astype(np.float64)
+    totals = np.bincount(rows, weights=counts, minlength=n_rows)
+
+    rest = (totals[rows] - counts)[:, None]
+    total = totals[rows][:, None]
+    with np.errstate(invalid='ignore'):
+        log_ratio = (gammaln(rest + 1) - gammaln(rest - depths + 1)
+                     - gammaln(total + 1) + gammaln(total - depths + 1))
+    absent = np.where(rest >= depths, np.exp(log_ratio), 0.0)
+    expected = np.stack([
+        np.bincount(rows, weights=1 - absent[:, i], minlength=n_rows) for i in range(len(depths))
+    ], axis=1)
+    return np.where(depths[None, :] <= totals[:, None], expected, np.nan)
+
+def _bootstrap_rows(matrix, depths, iterations, seed):
+    """
+    Subsample each row `iterations` times and return the mean richness at each depth.
+
+    Each individual gets a uniform random key; drawing n individuals without replacement
+    means taking the n smallest keys, so a species is seen at depth n when its smallest
+    key is at most the n-th smallest key overall.
+    """
+    rng = np.random.default_rng(seed)
+    result = np.full((matrix.shape[0], len(depths)), np.nan)
+    for row in range(matrix.shape[0]):
+        counts = matrix.data[matrix.indptr[row]:matrix.indptr[row + 1]]
+        total = int(counts.sum())
+        valid = depths <= total
+        if not valid.any():
+            continue
+        keys = rng.random((iterations, total))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        first_seen = np.minimum.reduceat(keys, starts, axis=1)
+        thresholds = np.sort(keys, axis=1)[:, depths[valid] - 1]
+        seen = (first_seen[:, :, None] <= thresholds[:, None, :]).sum(axis=1)
+        result[row, valid] = seen.mean(axis=0)
+    return result
+
+def bootstrap_rarefaction(matrix, depths, iterations=100, seed=0, max_workers=None):
+    """
+    Rarefaction curves of every row estimated by random subsampling, across a process pool.
+
+    Rows are split into contiguous batches, one per worker, each with its own seed so
+    results are reproducible for a given `seed` and worker count. Returns a rows x depths
+    array of mean richness; depths above a row's total are NaN.
+    """
+    matrix = sparse.csr_matrix(matrix)
+    depths = np.asarray(depths, dtype=np.int64)
+    max_workers = max_workers or os.cpu_count() or 1
+    batches = [batch for batch in np.array_split(np.arange(matrix.shape[0]), max_workers) if len(batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(batches))
+    if len(batches) <= 1:
+        return _bootstrap_rows(matrix, depths, iterations, seeds[0] if seeds else seed)
+    with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+        futures = [
+            pool.submit(_bootstrap_rows, matrix[batch], depths, iterations, batch_seed)
+            for batch, batch_seed in zip(batches, seeds)
+        ]
+        return np.vstack([future.result() for future in futures])
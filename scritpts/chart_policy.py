@@ -0,0 +1,73 @@
+# chart_policy.py
+import logging
+
+import pandas as pd
+
+# Label of the bucket that collects categories beyond the top N
+OTHER_LABEL = "Other"
+
+# Rendering policy of the high-cardinality charts:
+#   top_n  - categories drawn individually; the rest are summed into OTHER_LABEL
+CHART_POLICY = {
+    'aou_code': {'top_n': 25},
+    'plot': {'top_n': 25},
+    'distance': {'top_n': 25},
+}
+
+# Scatter-like views (scatter and line charts) with more points than this switch to WebGL traces
+WEBGL_POINT_THRESHOLD = 1000
+
+# Per-point trace arrays counted by figure_points (the longest one per trace)
+TRACE_ARRAYS = ('x', 'y', 'values', 'labels', 'ids')
+
+logger = logging.getLogger(__name__)
+
+def top_n_with_other(table, label, value, top_n, other_label=OTHER_LABEL):
+    """
+    Keep the `top_n` rows with the largest `value` and sum the rest into one `other_label` row.
+
+    Ties are broken by `label`, so every backend keeps the same rows at the cutoff.
+    """
+    if top_n is None or len(table) <= top_n:
+        return table
+    table = table.sort_values([value, label], ascending=[False, True], kind='stable')
+    head, rest = table.head(top_n), table.iloc[top_n:]
+    other = pd.DataFrame({label: [other_label], value: [rest[value].sum()]})
+    head = head[[label, value]].astype({label: object})
+    return pd.concat([head, other], ignore_index=True)
+
+def apply_policy(table, label, value, policy):
+    """
+    Bound the number of marks a chart draws by keeping its top N categories.
+    """
+    return top_n_with_other(table, label, value, policy.get('top_n'))
+
+def scatter_render_mode(points, threshold=WEBGL_POINT_THRESHOLD):
+    """
+    Return the plotly express render_mode for a scatter-like view with this many points.
+    """
+    return 'webgl' if points > threshold else 'svg'
+
+def figure_points(fig):
+    """
+    Count the data points of a figure's traces, which make up most of its payload.
+    """
+    points = 0
+    for trace in fig.data:
+        lengths = [len(array) for array in (getattr(trace, attribute, None) for attribute in TRACE_ARRAYS)
+                   if array is not None]
+        points += max(lengths, default=0)
+    return points
+
+def log_figure_payload(name, fig):
+    """
+    Log the size of a figure's payload, i.e. what is sent to the browser, and return its point count.
+
+    Points are counted from the trace arrays without serializing the figure; the JSON
+    size in bytes is only measured (with one extra serialization) when debug logging is on.
+    """
+    points = figure_points(fig)
+    logger.info(f"chart={name} traces={len(fig.data)} points={points}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"chart={name} payload_bytes={len(fig.to_json())}")
+    return points
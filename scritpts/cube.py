@@ -0,0 +1,61 @@
+# cube.py
+from filter_index import build_filter_index, resolve_filters
+
+# Dimensions the dashboard filters on; every cuboid is keyed by these plus its own dimensions
+FILTER_DIMENSIONS = ['location_type', 'common_name', 'observer']
+
+# Chart dimensions of each cuboid. Cuboids holding 'scientific_name' also give the species
+# set of each cell, so species richness can be answered from them. Plots nest in admin
+# units, so 'plot_species' carries the whole location hierarchy at no extra cells.
+CUBOIDS = {
+    'species': ['scientific_name'],
+    'month': ['month'],
+    'plot_species': ['admin_unit_code', 'plot_name', 'scientific_name'],
+    'distance': ['distance'],
+    'flyover': ['flyover_observed'],
+    'weather': ['sky', 'wind'],
+    'visit': ['visit'],
+    'aou_code': ['aou_code'],
+    'hour': ['start_hour'],
+}
+
+def build_cube(data, cuboids=CUBOIDS):
+    """
+    Pre-aggregate observation counts for each cuboid.
+
+    Returns a dict mapping each cuboid name to a DataFrame with one row per distinct
+    combination of FILTER_DIMENSIONS and the cuboid's dimensions, plus a 'count' column.
+    Cuboids whose columns are missing from `data` are skipped.
+    """
+    cube = {}
+    for name, dimensions in cuboids.items():
+        keys = FILTER_DIMENSIONS + [dim for dim in dimensions if dim not in FILTER_DIMENSIONS]
+        if not all(key in data.columns for key in keys):
+            continue
+        cells = data.groupby(keys, observed=True, dropna=False).size().reset_index(name='count')
+        cube[name] = cells[cells['count'] > 0].reset_index(drop=True)
+    return cube
+
+def index_cube(cube):
+    """
+    Build a bitmap filter index over the FILTER_DIMENSIONS of every cuboid.
+    """
+    return {name: build_filter_index(cells, FILTER_DIMENSIONS) for name, cells in cube.items()}
+
+def slice_cuboid(cube, name, filters, indexes=None):
+    """
+    Return the cells of a cuboid that match the filters.
+
+    `filters` maps filter dimensions to the list of accepted values; a missing or empty
+    list accepts every value. With `indexes` from index_cube, the matching cells are
+    found by combining bitmaps instead of comparing values.
+    """
+    cells = cube[name]
+    if not any(filters.values()):
+        return cells
+    if indexes is not None:
+        return cells.take(resolve_filters(indexes[name], filters))
+    for dimension, values in filters.items():
+        if values:
+            cells = cells[cells[dimension].isin(values)]
+    return cells
@@ -3,70 +3,283 @@ import pandas as pd
 import numpy as np
 from scipy.stats import zscore
 import logging
+import os
+
+from dataset import CLEANED_DATASET, write_dataset
+from ingestion import CACHE_DIR, read_workbooks
+from profiling import profiled, stage
+from temporal import TIME_COLUMNS, add_time_of_day
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def load_data(forest_file, grassland_file):
+def _combine_sheets(sheets):
+    """
+    Concatenate parsed sheets, skipping empty ones so they do not turn every column into object dtype.
+    """
+    frames = [sheet for sheet in sheets.values() if not sheet.empty]
+    if not frames:
+        return next(iter(sheets.values())).copy()
+    return pd.concat(frames)
+
+@profiled()
+def load_data(forest_file, grassland_file, cache_dir=CACHE_DIR, max_workers=None):
     """
     Load all sheets from the forest and grassland Excel files and combine them into DataFrames.
+
+    Both workbooks are parsed in parallel and each parsed sheet is cached under
+    `cache_dir`, so unchanged workbooks are not parsed again on the next run.
+    Pass `cache_dir=None` to disable the cache.
     """
     logging.info("Loading data from forest and grassland files...")
 
-    # Load all sheets from the forest file
-    forest_sheets = pd.ExcelFile(forest_file).sheet_names
-    forest_data = pd.concat(pd.read_excel(forest_file, sheet_name=sheet) for sheet in forest_sheets)
+    workbooks = read_workbooks([forest_file, grassland_file], cache_dir=cache_dir, max_workers=max_workers)
+
+    # Combine all sheets from the forest file
+    forest_data = _combine_sheets(workbooks[forest_file])
     forest_data['Location_Type'] = 'Forest'  # Add a column to identify forest data
 
-    # Load all sheets from the grassland file
-    grassland_sheets = pd.ExcelFile(grassland_file).sheet_names
-    grassland_data = pd.concat(pd.read_excel(grassland_file, sheet_name=sheet) for sheet in grassland_sheets)
+    # Combine all sheets from the grassland file
+    grassland_data = _combine_sheets(workbooks[grassland_file])
     grassland_data['Location_Type'] = 'Grassland'  # Add a column to identify grassland data
 
     logging.info("Data loading complete.")
     return forest_data, grassland_data
 
-def handle_missing_values(data):
+# Columns filled with their median when missing
+NUMERICAL_COLUMNS = ['temperature', 'humidity', 'initial_three_min_cnt']
+
+# Columns filled with "Unknown" when missing
+# ('distance' holds survey bands such as "<= 50 Meters", so it is categorical)
+CATEGORICAL_COLUMNS = ['sex', 'id_method', 'distance', 'sky', 'wind', 'disturbance', 'pif_watchlist_status', 'regional_stewardship_status']
+
+# Columns whose z-score outliers are removed, in order
+OUTLIER_COLUMNS = ['temperature', 'humidity']
+
+# Accepted values of the protocol's categorical fields ("Unknown" is the missing-value fill)
+SKY_CONDITIONS = ['Clear or Few Clouds', 'Partly Cloudy', 'Cloudy/Overcast', 'Fog', 'Mist/Drizzle', 'Unknown']
+WIND_CONDITIONS = [
+    'Calm (< 1 mph) smoke rises vertically',
+    'Light air movement (1-3 mph) smoke drifts',
+    'Light breeze (4-7 mph) wind felt on face',
+    'Gentle breeze (8-12 mph), leaves in motion',
+    'Unknown',
+]
+ID_METHODS = ['Singing', 'Calling', 'Visualization', 'Unknown']
+
+# Data-quality rules checked on the raw values: rule name -> {'column', and one of 'range'
+# (inclusive numeric bounds), 'allowed' (accepted values) or 'year_column' (the column
+# holding the year the row's date must fall in)}. Missing values pass the range and
+# vocabulary rules, as they are filled later; a missing or unparseable date, or a missing
+# year, fails its rule instead of becoming a placeholder date.
+VALIDATION_RULES = {
+    'temperature_range': {'column': 'temperature', 'range': (-10, 45)},
+    'humidity_range': {'column': 'humidity', 'range': (0, 100)},
+    'sky_vocabulary': {'column': 'sky', 'allowed': SKY_CONDITIONS},
+    'wind_vocabulary': {'column': 'wind', 'allowed': WIND_CONDITIONS},
+    'id_method_vocabulary': {'column': 'id_method', 'allowed': ID_METHODS},
+    'date_matches_year': {'column': 'date', 'year_column': 'year'},
+}
+
+# Where rows failing validation and the per-rule counts are written
+QUARANTINE_DIR = os.path.join("data", "quarantine")
+
+def standardize_column_names(data):
+    """
+    Standardize column names to lowercase with underscores.
+    """
+    data.columns = data.columns.str.strip().str.replace(" ", "_").str.lower()
+    return data
+
+def _stat_columns(data):
+    """
+    Return the numerical and outlier columns that need global statistics.
+
+    Columns are picked by name, not dtype: one unparseable cell turns a column into
+    object dtype, and while validation quarantines that row, the column must still get
+    its median and outlier bounds. Boolean columns (with or without missing values) are
+    flags, not measurements, and are left out.
+    """
+    columns = dict.fromkeys(NUMERICAL_COLUMNS + OUTLIER_COLUMNS)
+    return [
+        col for col in columns
+        if col in data.columns
+        and not pd.api.types.is_bool_dtype(data[col])
+        and pd.api.types.infer_dtype(data[col], skipna=True) != 'boolean'
+    ]
+
+def _as_numbers(values):
+    """
+    Convert a column to floats for the statistics; unparseable cells become missing.
+    """
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+def summarize_partition(data):
+    """
+    Summarize a partition for computing cleaning statistics.
+
+    The summary counts each distinct combination of values (missing values included)
+    across the numerical columns. Summaries of several partitions can be combined with
+    merge_summaries, and compute_cleaning_stats gives the same medians and z-score
+    bounds from the merged summary as from the concatenated partitions.
+    """
+    columns = _stat_columns(data)
+    if not columns:
+        return pd.Series(dtype='int64')
+    numbers = pd.DataFrame({col: _as_numbers(data[col]) for col in columns}, index=data.index)
+    return numbers.value_counts(dropna=False, sort=False)
+
+def merge_summaries(summaries):
+    """
+    Combine partition summaries into the summary of their union.
+    """
+    summaries = [summary for summary in summaries if not summary.empty]
+    if not summaries:
+        return pd.Series(dtype='int64')
+
+    # A column missing from a partition counts as missing values for all of its rows
+    columns = list(dict.fromkeys(name for summary in summaries for name in summary.index.names))
+    aligned = []
+    for summary in summaries:
+        cells = summary.index.to_frame(index=False).reindex(columns=columns).astype(float)
+        aligned.append(pd.Series(summary.to_numpy(), index=pd.MultiIndex.from_frame(cells)))
+
+    merged = pd.concat(aligned)
+    return merged.groupby(level=list(range(len(columns))), dropna=False).sum()
+
+def _weighted_median(values, weights):
+    """
+    Median of values repeated according to weights (matches Series.median).
+    """
+    present = ~np.isnan(values)
+    values, weights = values[present], weights[present]
+    if weights.sum() == 0:
+        return np.nan
+    order = np.argsort(values, kind='stable')
+    values, cumulative = values[order], np.cumsum(weights[order])
+    total = cumulative[-1]
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return (lower + upper) / 2
+
+def compute_cleaning_stats(summary, threshold=3, outlier_mode='sequential'):
+    """
+    Compute the medians and z-score parameters used by clean_data from a partition summary.
+
+    With outlier_mode='sequential' each column's mean and standard deviation only cover
+    the rows that passed the previous columns' outlier checks, as when filtering one
+    column after another. With outlier_mode='original' every column is scored against
+    the full (deduplicated, filled) distribution.
+    """
+    if outlier_mode not in ('sequential', 'original'):
+        raise ValueError(f"Unknown outlier_mode: {outlier_mode!r}")
+
+    stats = {'medians': {}, 'outliers': {}, 'threshold': threshold}
+    if summary.empty:
+        return stats
+
+    summary = summary.sort_index()
+    cells = summary.index.to_frame(index=False).astype(float)
+    weights = summary.to_numpy(dtype='int64')
+
+    for col in cells.columns:
+        stats['medians'][col] = _weighted_median(cells[col].to_numpy(), weights)
+
+    filled = cells.fillna(stats['medians']).fillna(0)
+    keep = np.ones(len(cells), dtype=bool)
+    for col in OUTLIER_COLUMNS:
+        if col not in filled.columns:
+            continue
+        values, counts = filled[col].to_numpy()[keep], weights[keep]
+        if counts.sum() == 0:
+            mean, std = np.nan, np.nan
+        else:
+            mean = np.average(values, weights=counts)
+            std = np.sqrt(np.average((values - mean) ** 2, weights=counts))
+        stats['outliers'][col] = (mean, std)
+        if outlier_mode == 'sequential':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                keep &= np.abs((filled[col].to_numpy() - mean) / std) < threshold
+
+    return stats
+
+def outlier_mask(data, stats):
+    """
+    Return a boolean array marking the rows within the z-score bounds of every outlier column.
+
+    Missing values are scored as their median fill value; nothing is written back to `data`.
+    """
+    keep = np.ones(len(data), dtype=bool)
+    for col, (mean, std) in stats['outliers'].items():
+        if col not in data.columns:
+            continue
+        values = _as_numbers(data[col])
+        values = np.where(np.isnan(values), stats['medians'].get(col, np.nan), values)
+        values = np.nan_to_num(values, nan=0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep &= np.abs((values - mean) / std) < stats['threshold']
+    return keep
+
+@profiled()
+def handle_missing_values(data, medians=None):
     """
     Handle missing values in the dataset.
+
+    `medians` maps numerical columns to fill values; by default they are computed from `data`.
+    Missing dates get a placeholder. clean_data never reaches that fill, as rows without
+    a date fail validation first, but callers cleaning without validation (such as the
+    step-by-step reference in benchmarks/bench_cleaning.py) still rely on it.
     """
     logging.info("Handling missing values...")
 
     # Fill missing numerical values with median
-    numerical_columns = ['temperature', 'humidity', 'distance', 'initial_three_min_cnt']
-    for col in numerical_columns:
+    for col in NUMERICAL_COLUMNS:
         if col in data.columns:
-            data[col].fillna(data[col].median(), inplace=True)
+            if medians is None:
+                if pd.api.types.is_numeric_dtype(data[col]):
+                    data[col] = data[col].fillna(data[col].median())
+            elif col in medians:
+                data[col] = data[col].fillna(medians[col])
 
     # Fill missing categorical values with "Unknown"
-    categorical_columns = ['sex', 'id_method', 'sky', 'wind', 'disturbance', 'pif_watchlist_status', 'regional_stewardship_status']
-    for col in categorical_columns:
+    for col in CATEGORICAL_COLUMNS:
         if col in data.columns:
-            data[col].fillna("Unknown", inplace=True)
+            data[col] = data[col].fillna("Unknown")
 
     # Fill missing dates with a placeholder (if necessary)
     if 'date' in data.columns:
-        data['date'].fillna(pd.Timestamp("1900-01-01"), inplace=True)
+        data['date'] = data['date'].fillna(pd.Timestamp("1900-01-01"))
 
     return data
 
-def remove_outliers(data, column, threshold=3):
+@profiled()
+def remove_outliers(data, column, threshold=3, mean=None, std=None):
     """
     Remove outliers from a numerical column using z-score.
+
+    `mean` and `std` default to the column's own statistics.
     """
-    if column in data.columns:
+    if column in data.columns and pd.api.types.is_numeric_dtype(data[column]):
         logging.info(f"Removing outliers from column: {column}")
-        data = data[(np.abs(zscore(data[column].fillna(0))) < threshold)]
+        values = data[column].fillna(0)
+        if mean is None or std is None:
+            scores = zscore(values)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = (values - mean) / std
+        data = data[(np.abs(scores) < threshold)]
     return data
 
+@profiled()
 def remove_duplicates(data):
     """
     Remove duplicate records from the dataset.
     """
     logging.info("Removing duplicate records...")
-    data.drop_duplicates(inplace=True)
+    data = data.drop_duplicates()
     return data
 
+@profiled()
 def validate_data_types(data):
     """
     Ensure correct data types for columns.
@@ -74,8 +287,7 @@ def validate_data_types(data):
     logging.info("Validating and correcting data types...")
 
     # Convert numerical columns to numeric
-    numerical_columns = ['temperature', 'humidity', 'distance', 'initial_three_min_cnt']
-    for col in numerical_columns:
+    for col in NUMERICAL_COLUMNS:
         if col in data.columns:
             data[col] = pd.to_numeric(data[col], errors='coerce')
 
@@ -89,21 +301,125 @@ def validate_data_types(data):
 
     return data
 
-def clean_data(data):
+def rule_failures(data, rules=VALIDATION_RULES):
+    """
+    Evaluate the validation rules on `data`, one vectorized check per rule.
+
+    Returns a boolean DataFrame aligned with `data` with one column per rule whose column
+    is present, True where the row fails the rule.
+    """
+    failures = {}
+    for name, rule in rules.items():
+        column = rule['column']
+        if column not in data.columns:
+            continue
+        values = data[column]
+        present = values.notna().to_numpy()
+        if 'range' in rule:
+            numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            low, high = rule['range']
+            with np.errstate(invalid='ignore'):
+                failed = present & ~((numbers >= low) & (numbers <= high))
+        elif 'allowed' in rule:
+            failed = present & ~values.isin(rule['allowed']).to_numpy()
+        elif 'year_column' in rule:
+            # Dates already parsed by the workbook reader skip the (slow) conversion
+            dates = values if pd.api.types.is_datetime64_any_dtype(values) else pd.to_datetime(values, errors='coerce')
+            years = data[rule['year_column']] if rule['year_column'] in data.columns else pd.Series(np.nan, index=data.index)
+            years = pd.to_numeric(years, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            # NaN never compares equal, so a missing date or year fails
+            failed = dates.dt.year.to_numpy(dtype=float, na_value=np.nan) != years
+        else:
+            raise ValueError(f"Rule {name!r} has no range, allowed values or year column")
+        failures[name] = failed
+    return pd.DataFrame(failures, index=data.index, dtype=bool)
+
+def valid_rows(data, rules=VALIDATION_RULES):
+    """
+    Return a boolean array marking the rows of `data` that pass every validation rule.
+    """
+    return ~rule_failures(data, rules).any(axis=1).to_numpy()
+
+def validation_report(failures):
+    """
+    Count the rows failing each rule, and the rows failing any, from rule_failures output.
+    """
+    report = failures.sum().rename_axis('rule').reset_index(name='failed')
+    report['column'] = report['rule'].map(lambda name: VALIDATION_RULES.get(name, {}).get('column'))
+    report = pd.concat([report, pd.DataFrame([{'rule': 'any', 'failed': int(failures.any(axis=1).sum())}])],
+                       ignore_index=True)
+    return report[['rule', 'column', 'failed']]
+
+def save_quarantine(quarantined, directory=QUARANTINE_DIR):
+    """
+    Write the rows that failed validation and the per-rule failure counts to `directory`.
+
+    `quarantined` is the list filled by clean_data; the rows go to rows.csv with one
+    boolean column per rule, and the counts to report.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rows = pd.concat(quarantined, ignore_index=True) if quarantined else pd.DataFrame()
+    report = validation_report(rows.reindex(columns=list(VALIDATION_RULES)).eq(True))
+    rows.to_csv(os.path.join(directory, "rows.csv"), index=False)
+    report.to_json(os.path.join(directory, "report.json"), orient='records', indent=2)
+    logging.info(f"Quarantined {len(rows)} rows to {directory}")
+    return report
+
+@profiled()
+def clean_data(data, stats=None, outlier_mode='sequential', rules=VALIDATION_RULES, quarantine=None):
     """
     Clean and preprocess the dataset.
+
+    Duplicates and outliers are resolved into a single row mask, so the surviving rows are
+    copied once and then filled and converted column by column. `stats` are the medians
+    and outlier bounds from compute_cleaning_stats; by default they are computed from
+    `data` itself using `outlier_mode`. Passing stats computed over a larger dataset
+    cleans one partition exactly as it would be cleaned as part of that dataset.
+
+    Rows failing any of the validation `rules` are dropped in the same mask, before the
+    statistics are computed, so out-of-range values never skew the medians or outlier
+    bounds. The rules are row-local, so partitions validate independently; stats computed
+    elsewhere must likewise summarize only valid rows (see valid_rows). If `quarantine`
+    is a list, the failing rows are appended to it with one boolean column per rule.
     """
     logging.info("Cleaning data...")
 
-    # Handle missing values
-    data = handle_missing_values(data)
-
-    # Remove duplicates
-    data = remove_duplicates(data)
+    # Standardize column names first so the column-specific steps below find their columns
+    data = standardize_column_names(data)
+
+    # Remove duplicates before computing statistics so repeated rows do not skew them
+    with stage('remove_duplicates', rows_in=len(data)) as record:
+        unique = ~data.duplicated().to_numpy()
+        keep = unique.copy()
+        record['rows_out'] = int(keep.sum())
+
+    # Validate the raw values before anything is coerced, and drop the failing rows in the same mask
+    with stage('validate_rules', rows_in=int(keep.sum())) as record:
+        failures = rule_failures(data, rules)
+        invalid = failures.any(axis=1).to_numpy() & unique
+        for rule, _, failed in validation_report(failures[unique]).itertuples(index=False, name=None):
+            if failed:
+                logging.warning(f"Validation rule {rule} failed for {failed} row(s)")
+        if quarantine is not None and invalid.any():
+            quarantine.append(data[invalid].join(failures[invalid]))
+        keep &= ~invalid
+        record['rows_out'] = int(keep.sum())
+
+    # Statistics of the unique, valid rows
+    if stats is None:
+        with stage('cleaning_stats', rows_in=int(keep.sum())):
+            numbers = data[_stat_columns(data)]
+            stats = compute_cleaning_stats(summarize_partition(numbers[keep]), outlier_mode=outlier_mode)
+
+    # Remove outliers from specific columns, combined with the duplicate and validation masks
+    logging.info(f"Removing outliers from columns: {', '.join(stats['outliers']) or 'none'}")
+    with stage('remove_outliers', rows_in=int(keep.sum())) as record:
+        keep &= outlier_mask(data, stats)
+        record['rows_out'] = int(keep.sum())
+    data = data.take(np.flatnonzero(keep))
 
-    # Remove outliers from specific columns
-    for column in ['temperature', 'humidity', 'distance']:
-        data = remove_outliers(data, column)
+    # Handle missing values
+    data = handle_missing_values(data, stats['medians'])
 
     # Validate and correct data types
     data = validate_data_types(data)
@@ -113,12 +429,21 @@ def clean_data(data):
         data['year'] = data['date'].dt.year
         data['month'] = data['date'].dt.month
 
-    # Standardize column names
-    data.columns = data.columns.str.strip().str.replace(" ", "_").str.lower()
+    # Parse the survey times once into integer seconds since midnight
+    data = add_time_of_day(data)
 
     logging.info("Data cleaning complete.")
     return data
 
+def cleaned_columns(columns):
+    """
+    Return the columns clean_data produces from a frame with the given columns.
+    """
+    derived = ['year', 'month'] if 'date' in columns else []
+    derived += [seconds for column, seconds in TIME_COLUMNS.items() if column in columns]
+    return list(dict.fromkeys(list(columns) + derived))
+
+@profiled()
 def merge_datasets(forest_data, grassland_data):
     """
     Merge the forest and grassland datasets into a single DataFrame.
@@ -126,7 +451,7 @@ def merge_datasets(forest_data, grassland_data):
     logging.info("Merging forest and grassland datasets...")
 
     # Align columns between the two datasets
-    common_columns = list(set(forest_data.columns) & set(grassland_data.columns))
+    common_columns = [col for col in forest_data.columns if col in grassland_data.columns]
     forest_data = forest_data[common_columns]
     grassland_data = grassland_data[common_columns]
 
@@ -136,26 +461,84 @@ def merge_datasets(forest_data, grassland_data):
     logging.info("Datasets merged successfully.")
     return combined_data
 
-def save_cleaned_data(data, output_path):
+@profiled()
+def save_cleaned_data(data, output_path=CLEANED_DATASET):
     """
-    Save the cleaned dataset to a CSV file.
+    Save the cleaned dataset as a Parquet dataset partitioned by habitat and admin unit.
     """
     logging.info(f"Saving cleaned data to {output_path}...")
-    data.to_csv(output_path, index=False)
+    write_dataset(data, output_path)
     logging.info("Cleaned data saved successfully.")
 
 if __name__ == "__main__":
-    # File paths
-    forest_file = "data\Bird_Monitoring_Data_FOREST.XLSX"
-    grassland_file = "data\Bird_Monitoring_Data_GRASSLAND.XLSX"
-    output_file = "data\cleaned_bird_data.csv"
-
-    # Load, clean, and merge data
-    logging.info("Starting data processing pipeline...")
-    forest_data, grassland_data = load_data(forest_file, grassland_file)
-    forest_data = clean_data(forest_data)
-    grassland_data = clean_data(grassland_data)
-    combined_data = merge_datasets(forest_data, grassland_data)
-    save_cleaned_data(combined_data, output_file)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Clean and merge the bird monitoring workbooks.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-clean and rewrite the sheets that changed since the last incremental run")
+    parser.add_argument("--streaming", action="store_true",
+                        help="clean the cached sheets chunk by chunk with bounded memory")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per chunk in streaming mode")
+    parser.add_argument("--max-memory-mb", type=int, default=256,
+                        help="memory budget used to size chunks in streaming mode")
+    parser.add_argument("--outlier-mode", choices=["sequential", "original"], default="sequential",
+                        help="score each outlier column after the previous filters, or all against the original data")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes used to parse sheets")
+    parser.add_argument("--no-cache", action="store_true", help="parse every sheet instead of using the sheet cache")
+    parser.add_argument("--stages", default=None,
+                        help="write the wall time, CPU time, peak memory and rows of each stage to this JSON file")
+    parser.add_argument("--profile", default=None,
+                        help="write a cProfile dump (or a pyinstrument report for .html paths) of the run to this file")
+    parser.add_argument("--sql-backend", nargs="?", const="sqlite", default=None, choices=["sqlite", "duckdb"],
+                        help="also publish an indexed SQLite (default) or DuckDB copy for the dashboard's SQL backend")
+    args = parser.parse_args()
 
+    # File paths
+    forest_file = os.path.join("data", "Bird_Monitoring_Data_FOREST.XLSX")
+    grassland_file = os.path.join("data", "Bird_Monitoring_Data_GRASSLAND.XLSX")
+    output_path = CLEANED_DATASET
+    cache_dir = None if args.no_cache else CACHE_DIR
+    quarantine = []
+
+    # Measure the whole run as one stage, profiling it on request
+    from contextlib import nullcontext
+
+    from profiling import profile_to, write_stage_report
+
+    with profile_to(args.profile) if args.profile else nullcontext(), stage('pipeline'):
+        if args.streaming:
+            from ingestion import cache_workbooks
+            from streaming import clean_streaming
+
+            cached = cache_workbooks([forest_file, grassland_file], max_workers=args.workers)
+            sources = [('Forest', sheet) for sheet in cached[forest_file].values()]
+            sources += [('Grassland', sheet) for sheet in cached[grassland_file].values()]
+            clean_streaming(sources, output_path, chunk_size=args.chunk_size, max_memory_mb=args.max_memory_mb,
+                            outlier_mode=args.outlier_mode, quarantine=quarantine)
+        elif args.incremental:
+            from incremental import run_incremental
+
+            run_incremental(forest_file, grassland_file, output_path, cache_dir=cache_dir,
+                            max_workers=args.workers, outlier_mode=args.outlier_mode, quarantine=quarantine)
+        else:
+            # Load, clean, and merge data
+            logging.info("Starting data processing pipeline...")
+            forest_data, grassland_data = load_data(forest_file, grassland_file, cache_dir=cache_dir,
+                                                    max_workers=args.workers)
+            forest_data = clean_data(forest_data, outlier_mode=args.outlier_mode, quarantine=quarantine)
+            grassland_data = clean_data(grassland_data, outlier_mode=args.outlier_mode, quarantine=quarantine)
+            combined_data = merge_datasets(forest_data, grassland_data)
+            save_cleaned_data(combined_data, output_path)
+
+        # Rows failing validation and the per-rule counts
+        save_quarantine(quarantine)
+
+        # Publish a new immutable snapshot for the dashboard to pick up
+        from snapshots import publish_snapshot
+
+        with stage('publish_snapshot'):
+            publish_snapshot(output_path, database=args.sql_backend)
+
+    if args.stages:
+        write_stage_report(args.stages)
     logging.info("Data processing pipeline complete.")
@@ -0,0 +1,274 @@
+# dataset.py
+import itertools
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Location of the cleaned, partitioned Parquet dataset written by the pipeline
+CLEANED_DATASET = os.path.join("data", "cleaned_bird_data")
+
+# Columns used as hive-style directory partitions (location_type=.../admin_unit_code=...)
+PARTITION_COLUMNS = ['location_type', 'admin_unit_code']
+
+# Low-cardinality string columns stored dictionary-encoded and loaded as pandas categoricals
+CATEGORICAL_COLUMNS = ['admin_unit_code', 'plot_name', 'common_name', 'observer', 'sky', 'wind']
+
+# Other text columns; stored as strings even when a sheet leaves them entirely empty
+STRING_COLUMNS = [
+    'sub_unit_code', 'site_name', 'location_type', 'interval_length', 'id_method',
+    'distance', 'sex', 'scientific_name', 'aou_code', 'disturbance',
+]
+
+BOOL_COLUMNS = [
+    'flyover_observed', 'pif_watchlist_status', 'regional_stewardship_status',
+    'initial_three_min_cnt', 'previously_obs',
+]
+
+# Explicit Arrow types, so every file of the dataset agrees regardless of which rows it holds;
+# columns not listed here keep the type inferred from pandas
+COLUMN_TYPES = {
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    **{col: pa.string() for col in STRING_COLUMNS},
+    **{col: pa.bool_() for col in BOOL_COLUMNS},
+    'date': pa.timestamp('us'),
+    'start_time': pa.time64('us'),
+    'end_time': pa.time64('us'),
+    'year': pa.int64(),
+    'month': pa.int64(),
+    'start_seconds': pa.int32(),
+    'end_seconds': pa.int32(),
+    'visit': pa.int64(),
+    'temperature': pa.float64(),
+    'humidity': pa.float64(),
+    'acceptedtsn': pa.float64(),
+    'taxoncode': pa.float64(),
+    'npstaxoncode': pa.float64(),
+}
+
+# In-memory types of read_compact: every text column becomes a categorical, times of day
+# become timedelta offsets from midnight, and small integers and measurements use narrow
+# dtypes (boolean flags already take one byte)
+COMPACT_CATEGORICAL_COLUMNS = CATEGORICAL_COLUMNS + STRING_COLUMNS
+COMPACT_TYPES = {
+    'year': 'int16',
+    'month': 'int8',
+    'visit': 'int8',
+    'start_seconds': 'int32',
+    'end_seconds': 'int32',
+    'temperature': 'float32',
+    'humidity': 'float32',
+}
+
+def _coerce_to_schema(data):
+    """
+    Cast the columns covered by COLUMN_TYPES to the matching pandas dtypes.
+    """
+    data = data.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    for col in STRING_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('string')
+    if 'date' in data.columns:
+        data['date'] = pd.to_datetime(data['date'], errors='coerce').astype('datetime64[us]')
+    if 'flyover_observed' in data.columns:
+        data['flyover_observed'] = data['flyover_observed'].astype(bool)
+    return data
+
+def build_schema(data):
+    """
+    Build the Arrow schema of the cleaned dataset for the columns present in `data`.
+    """
+    inferred = pa.Schema.from_pandas(data, preserve_index=False)
+    fields = [
+        pa.field(field.name, COLUMN_TYPES.get(field.name, field.type))
+        for field in inferred
+    ]
+    return pa.schema(fields)
+
+def to_arrow(data):
+    """
+    Convert a cleaned DataFrame to an Arrow table with the dataset schema.
+    """
+    data = _coerce_to_schema(data)
+    table = pa.Table.from_pandas(data, schema=build_schema(data), preserve_index=False)
+    # Drop the pandas metadata so readers get the same dtypes however a file was written
+    return table.replace_schema_metadata(None)
+
+def write_partitions(data, path=CLEANED_DATASET, basename_template="part-{i}.parquet"):
+    """
+    Add the rows of `data` to the dataset at `path`, leaving other files in place.
+
+    Returns the paths of the files written.
+    """
+    table = to_arrow(data)
+    written = []
+    ds.write_dataset(
+        table,
+        path,
+        format='parquet',
+        partitioning=[col for col in PARTITION_COLUMNS if col in table.column_names],
+        partitioning_flavor='hive',
+        basename_template=basename_template,
+        existing_data_behavior='overwrite_or_ignore',
+        file_visitor=lambda written_file: written.append(written_file.path),
+    )
+    return written
+
+def write_dataset(data, path=CLEANED_DATASET):
+    """
+    Write the cleaned data as a Parquet dataset partitioned by PARTITION_COLUMNS.
+
+    Any existing dataset at `path` is replaced.
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    write_partitions(data, path)
+    logging.info(f"Wrote {len(data)} rows to {path}")
+
+def write_stream(tables, path=CLEANED_DATASET, rows_per_group=64 * 1024):
+    """
+    Write an iterable of Arrow tables as the partitioned dataset, one table at a time.
+
+    The schema is taken from the first table; later tables are cast to it. Rows are
+    flushed in groups of at most `rows_per_group`, so memory use does not grow with
+    the total number of rows. Any existing dataset at `path` is replaced.
+    Returns the number of rows written.
+    """
+    tables = iter(tables)
+    first = next(tables, None)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    if first is None:
+        return 0
+
+    schema = first.schema
+    written = [0]
+
+    def batches():
+        for table in itertools.chain([first], tables):
+            table = table.select(schema.names).cast(schema)
+            written[0] += table.num_rows
+            yield from table.to_batches()
+
+    ds.write_dataset(
+        batches(),
+        path,
+        schema=schema,
+        format='parquet',
+        partitioning=[col for col in PARTITION_COLUMNS if col in schema.names],
+        partitioning_flavor='hive',
+        min_rows_per_group=0,
+        max_rows_per_group=rows_per_group,
+        existing_data_behavior='overwrite_or_ignore',
+    )
+    return written[0]
+
+def read_dataset(path=CLEANED_DATASET, columns=None, filters=None):
+    """
+    Load the cleaned dataset into a DataFrame.
+
+    `columns` restricts which columns are read and `filters` prunes partitions and
+    row groups, using pyarrow's filter syntax, e.g. [('location_type', '=', 'Forest')].
+    """
+    table = pq.read_table(path, columns=columns, filters=filters, partitioning='hive')
+    return table.to_pandas()
+
+def compact_table(table):
+    """
+    Convert an Arrow table of the cleaned dataset to the compact layout of COMPACT_TYPES.
+
+    Text columns are dictionary-encoded, time-of-day columns become durations since
+    midnight and the COMPACT_TYPES columns are cast to their narrow types, all in Arrow.
+    """
+    for i, field in enumerate(table.schema):
+        column = table.column(i)
+        if field.name in COMPACT_CATEGORICAL_COLUMNS and not pa.types.is_dictionary(field.type):
+            column = column.dictionary_encode()
+        elif pa.types.is_time(field.type):
+            column = column.cast(pa.int64()).cast(pa.duration(field.type.unit))
+        elif field.name in COMPACT_TYPES:
+            column = column.cast(pa.from_numpy_dtype(np.dtype(COMPACT_TYPES[field.name])))
+        table = table.set_column(i, field.name, column)
+    return table
+
+def _compact_frame(table, **options):
+    """
+    Convert a compact Arrow table to pandas; integer columns with missing values use the
+    nullable dtype of the same width.
+    """
+    data = table.to_pandas(**options)
+    types = {}
+    for col, dtype in COMPACT_TYPES.items():
+        if col in data.columns and data[col].dtype != dtype:
+            nullable = dtype.startswith('int') and data[col].isna().any()
+            types[col] = dtype.capitalize() if nullable else dtype
+    return data.astype(types) if types else data
+
+def read_compact(path=CLEANED_DATASET, columns=None, filters=None):
+    """
+    Load the cleaned dataset into a compact DataFrame, typed by COMPACT_TYPES.
+
+    Text columns are dictionary-encoded in Arrow before conversion, so pandas gets
+    categoricals (and groupbys run on their integer codes) without materializing a
+    Python string per row; time-of-day columns become timedelta64 instead of one
+    datetime.time object per row. Integer columns with missing values use the nullable
+    dtype of the same width.
+    """
+    table = pq.read_table(path, columns=columns, filters=filters, partitioning='hive')
+    return _compact_frame(compact_table(table))
+
+def publish_shared(source, path):
+    """
+    Publish the cleaned dataset at `source` as an Arrow IPC file in the compact layout.
+
+    The file is written next to `path` and moved into place with os.replace, so readers
+    see either the previous or the new file, never a partial one. Processes that already
+    mapped the previous file keep reading it until they map the new one.
+    Returns the number of rows written.
+    """
+    table = compact_table(pq.read_table(source, partitioning='hive'))
+    # The IPC file format needs one dictionary per column across all record batches
+    table = table.unify_dictionaries().combine_chunks()
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(temporary, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(temporary, path)
+    logging.info(f"Published {table.num_rows} rows to {path}")
+    return table.num_rows
+
+def map_shared(path, columns=None):
+    """
+    Load the published dataset by memory-mapping its Arrow IPC file read-only.
+
+    The column buffers are pages of the mapped file, shared through the OS page cache
+    by every process that maps it, and numeric columns are converted to pandas without
+    copying where possible. Returns the same compact frame as read_compact.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return _compact_frame(table, split_blocks=True)
+
+def memory_report(data):
+    """
+    Return the memory footprint of each column of `data`, largest first.
+
+    Columns: dtype, bytes (including the Python objects of object columns), bytes_per_row
+    and share of the total.
+    """
+    sizes = data.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'dtype': data.dtypes.astype(str),
+        'bytes': sizes,
+        'bytes_per_row': sizes / max(len(data), 1),
+        'share': sizes / max(sizes.sum(), 1),
+    })
+    return report.sort_values('bytes', ascending=False)
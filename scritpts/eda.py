@@ -1,231 +1,261 @@
 # Import necessary libraries
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# Load the cleaned dataset
-data = pd.read_csv("data\cleaned_bird_data.csv")
-
-# Ensure 'date' is in datetime format
-data['date'] = pd.to_datetime(data['date'], errors='coerce')
-
-# Extract additional temporal features
-data['year'] = data['date'].dt.year
-data['month'] = data['date'].dt.month
-data['season'] = data['month'].apply(lambda x: 'Winter' if x in [12, 1, 2] else
-                                                 'Spring' if x in [3, 4, 5] else
-                                                 'Summer' if x in [6, 7, 8] else
-                                                 'Fall')
+from analytics import add_derived_features, count_by, distinct_count, hour_counts
+from temporal import hourly_detection_rates
 
 # Set up visualization styles
 sns.set(style="whitegrid")
 plt.rcParams['figure.figsize'] = (12, 6)
 
+# Each analysis is split into an aggregation, which turns the observations into a small
+# table, and a plot of that table returning a matplotlib Figure. Aggregations take the
+# extra `keys` to group by, so one call can produce the tables of many reports at once.
+
+def _top(table, column, n=10):
+    return table.sort_values(column, ascending=False, kind='stable').head(n)
+
 # -------------------------------
 # 1. Temporal Analysis
 # -------------------------------
 
 # Seasonal Trends
-def seasonal_trends(data):
-    seasonal_data = data.groupby(['season', 'year']).size().reset_index(name='observation_count')
-    sns.lineplot(data=seasonal_data, x='year', y='observation_count', hue='season', marker='o')
-    plt.title("Seasonal Trends in Bird Observations")
-    plt.xlabel("Year")
-    plt.ylabel("Number of Observations")
-    plt.legend(title="Season")
-    plt.show()
+def seasonal_trends_table(data, keys=()):
+    return count_by(data, [*keys, 'season', 'year'])
+
+def seasonal_trends(seasonal_data):
+    fig, ax = plt.subplots()
+    sns.lineplot(data=seasonal_data, x='year', y='observation_count', hue='season', marker='o', ax=ax)
+    ax.set_title("Seasonal Trends in Bird Observations")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Number of Observations")
+    ax.legend(title="Season")
+    return fig
 
 # Observation Time Analysis
-def observation_time_analysis(data):
-    data['start_hour'] = pd.to_datetime(data['start_time'], format='%H:%M:%S', errors='coerce').dt.hour
-    data['end_hour'] = pd.to_datetime(data['end_time'], format='%H:%M:%S', errors='coerce').dt.hour
-    sns.histplot(data['start_hour'], bins=24, kde=False, color='blue', label='Start Time')
-    sns.histplot(data['end_hour'], bins=24, kde=False, color='orange', label='End Time')
-    plt.title("Observation Time Analysis")
-    plt.xlabel("Hour of the Day")
-    plt.ylabel("Number of Observations")
-    plt.legend()
-    plt.show()
+def observation_time_table(data, keys=()):
+    return hour_counts(data, keys)
+
+def observation_time_analysis(hourly_data):
+    fig, ax = plt.subplots()
+    ax.bar(hourly_data['hour'], hourly_data['start_count'], width=1, alpha=0.6, color='blue', label='Start Time')
+    ax.bar(hourly_data['hour'], hourly_data['end_count'], width=1, alpha=0.6, color='orange', label='End Time')
+    ax.set_title("Observation Time Analysis")
+    ax.set_xlabel("Hour of the Day")
+    ax.set_ylabel("Number of Observations")
+    ax.legend()
+    return fig
+
+# Detection Rates (observations per survey hour, so uneven survey effort does not bias the counts)
+def detection_rate_table(data, keys=()):
+    return hourly_detection_rates(data, by=list(dict.fromkeys([*keys, 'location_type'])))
+
+def detection_rate_analysis(rate_data):
+    fig, ax = plt.subplots()
+    sns.lineplot(data=rate_data, x='start_hour', y='detection_rate', hue='location_type', marker='o', ax=ax)
+    ax.set_title("Detection Rate by Hour of Day")
+    ax.set_xlabel("Survey Start Hour")
+    ax.set_ylabel("Observations per Survey Hour")
+    ax.legend(title="Habitat Type")
+    return fig
 
 # -------------------------------
 # 2. Spatial Analysis
 # -------------------------------
 
 # Location Insights
-def location_insights(data):
-    location_data = data.groupby('location_type')['scientific_name'].nunique().reset_index()
-    sns.barplot(data=location_data, x='location_type', y='scientific_name', palette='viridis')
-    plt.title("Biodiversity by Habitat Type")
-    plt.xlabel("Habitat Type")
-    plt.ylabel("Number of Unique Species")
-    plt.show()
+def richness_by_habitat_table(data, keys=()):
+    return distinct_count(data, [*keys, 'location_type'], 'scientific_name')
+
+def location_insights(location_data):
+    fig, ax = plt.subplots()
+    sns.barplot(data=location_data, x='location_type', y='scientific_name', palette='viridis', ax=ax)
+    ax.set_title("Biodiversity by Habitat Type")
+    ax.set_xlabel("Habitat Type")
+    ax.set_ylabel("Number of Unique Species")
+    return fig
 
 # Plot-Level Analysis
-def plot_level_analysis(data):
-    plot_data = data.groupby('plot_name')['scientific_name'].nunique().reset_index().sort_values(by='scientific_name', ascending=False).head(10)
-    sns.barplot(data=plot_data, x='scientific_name', y='plot_name', palette='coolwarm')
-    plt.title("Top 10 Biodiversity Hotspots (Plots)")
-    plt.xlabel("Number of Unique Species")
-    plt.ylabel("Plot Name")
-    plt.show()
+def plot_level_table(data, keys=()):
+    return distinct_count(data, [*keys, 'plot_name'], 'scientific_name')
+
+def plot_level_analysis(plot_data):
+    plot_data = _top(plot_data, 'scientific_name')
+    fig, ax = plt.subplots()
+    sns.barplot(data=plot_data, x='scientific_name', y='plot_name', palette='coolwarm', ax=ax)
+    ax.set_title("Top 10 Biodiversity Hotspots (Plots)")
+    ax.set_xlabel("Number of Unique Species")
+    ax.set_ylabel("Plot Name")
+    return fig
 
 # -------------------------------
 # 3. Species Analysis
 # -------------------------------
 
 # Diversity Metrics
-def diversity_metrics(data):
-    diversity_data = data.groupby('location_type')['scientific_name'].nunique().reset_index()
-    sns.barplot(data=diversity_data, x='location_type', y='scientific_name', palette='magma')
-    plt.title("Species Diversity Across Habitat Types")
-    plt.xlabel("Habitat Type")
-    plt.ylabel("Number of Unique Species")
-    plt.show()
+def diversity_metrics(diversity_data):
+    fig, ax = plt.subplots()
+    sns.barplot(data=diversity_data, x='location_type', y='scientific_name', palette='magma', ax=ax)
+    ax.set_title("Species Diversity Across Habitat Types")
+    ax.set_xlabel("Habitat Type")
+    ax.set_ylabel("Number of Unique Species")
+    return fig
+
+def value_count_table(column):
+    """
+    Return an aggregation counting observations per value of `column`.
+    """
+    def aggregate(data, keys=()):
+        return count_by(data, [*keys, column], name='count')
+    return aggregate
 
 # Activity Patterns
-def activity_patterns(data):
-    activity_data = data['id_method'].value_counts().reset_index()
-    activity_data.columns = ['id_method', 'count']
-    sns.barplot(data=activity_data, x='count', y='id_method', palette='plasma')
-    plt.title("Activity Patterns (ID Method)")
-    plt.xlabel("Number of Observations")
-    plt.ylabel("ID Method")
-    plt.show()
+def activity_patterns(activity_data):
+    activity_data = activity_data.sort_values('count', ascending=False, kind='stable')
+    fig, ax = plt.subplots()
+    sns.barplot(data=activity_data, x='count', y='id_method', palette='plasma', ax=ax)
+    ax.set_title("Activity Patterns (ID Method)")
+    ax.set_xlabel("Number of Observations")
+    ax.set_ylabel("ID Method")
+    return fig
 
 # Sex Ratio
-def sex_ratio(data):
-    sex_data = data['sex'].value_counts().reset_index()
-    sex_data.columns = ['sex', 'count']
-    sns.barplot(data=sex_data, x='sex', y='count', palette='pastel')
-    plt.title("Sex Ratio of Observed Birds")
-    plt.xlabel("Sex")
-    plt.ylabel("Number of Observations")
-    plt.show()
+def sex_ratio(sex_data):
+    sex_data = sex_data.sort_values('count', ascending=False, kind='stable')
+    fig, ax = plt.subplots()
+    sns.barplot(data=sex_data, x='sex', y='count', palette='pastel', ax=ax)
+    ax.set_title("Sex Ratio of Observed Birds")
+    ax.set_xlabel("Sex")
+    ax.set_ylabel("Number of Observations")
+    return fig
 
 # -------------------------------
 # 4. Environmental Conditions
 # -------------------------------
 
 # Weather Correlation
-def weather_correlation(data):
-    sns.scatterplot(data=data, x='temperature', y='humidity', hue='sky', style='wind', palette='coolwarm')
-    plt.title("Weather Correlation: Temperature vs Humidity")
-    plt.xlabel("Temperature (°C)")
-    plt.ylabel("Humidity (%)")
-    plt.legend(title="Sky Condition")
-    plt.show()
+def weather_table(data, keys=()):
+    return data[[*keys, 'temperature', 'humidity', 'sky', 'wind']]
+
+def weather_correlation(weather_data):
+    fig, ax = plt.subplots()
+    sns.scatterplot(data=weather_data, x='temperature', y='humidity', hue='sky', style='wind', palette='coolwarm', ax=ax)
+    ax.set_title("Weather Correlation: Temperature vs Humidity")
+    ax.set_xlabel("Temperature (°C)")
+    ax.set_ylabel("Humidity (%)")
+    ax.legend(title="Sky Condition")
+    return fig
 
 # Disturbance Effect
-def disturbance_effect(data):
-    disturbance_data = data['disturbance'].value_counts().reset_index()
-    disturbance_data.columns = ['disturbance', 'count']
-    sns.barplot(data=disturbance_data, x='count', y='disturbance', palette='cubehelix')
-    plt.title("Impact of Disturbance on Bird Observations")
-    plt.xlabel("Number of Observations")
-    plt.ylabel("Disturbance Type")
-    plt.show()
+def disturbance_effect(disturbance_data):
+    disturbance_data = disturbance_data.sort_values('count', ascending=False, kind='stable')
+    fig, ax = plt.subplots()
+    sns.barplot(data=disturbance_data, x='count', y='disturbance', palette='cubehelix', ax=ax)
+    ax.set_title("Impact of Disturbance on Bird Observations")
+    ax.set_xlabel("Number of Observations")
+    ax.set_ylabel("Disturbance Type")
+    return fig
 
 # -------------------------------
 # 5. Distance and Behavior
 # -------------------------------
 
 # Distance Analysis
-def distance_analysis(data):
-    distance_data = data['distance'].value_counts().reset_index()
-    distance_data.columns = ['distance', 'count']
-    sns.barplot(data=distance_data, x='count', y='distance', palette='viridis')
-    plt.title("Distance Analysis")
-    plt.xlabel("Number of Observations")
-    plt.ylabel("Distance")
-    plt.show()
+def distance_analysis(distance_data):
+    distance_data = distance_data.sort_values('count', ascending=False, kind='stable')
+    fig, ax = plt.subplots()
+    sns.barplot(data=distance_data, x='count', y='distance', palette='viridis', ax=ax)
+    ax.set_title("Distance Analysis")
+    ax.set_xlabel("Number of Observations")
+    ax.set_ylabel("Distance")
+    return fig
 
 # Flyover Frequency
-def flyover_frequency(data):
-    flyover_data = data['flyover_observed'].value_counts().reset_index()
-    flyover_data.columns = ['flyover_observed', 'count']
-    sns.barplot(data=flyover_data, x='flyover_observed', y='count', palette='coolwarm')
-    plt.title("Flyover Frequency")
-    plt.xlabel("Flyover Observed")
-    plt.ylabel("Number of Observations")
-    plt.show()
+def flyover_frequency(flyover_data):
+    fig, ax = plt.subplots()
+    sns.barplot(data=flyover_data, x='flyover_observed', y='count', palette='coolwarm', ax=ax)
+    ax.set_title("Flyover Frequency")
+    ax.set_xlabel("Flyover Observed")
+    ax.set_ylabel("Number of Observations")
+    return fig
 
 # -------------------------------
 # 6. Observer Trends
 # -------------------------------
 
 # Observer Bias
-def observer_bias(data):
-    observer_data = data['observer'].value_counts().reset_index().head(10)
-    observer_data.columns = ['observer', 'count']
-    sns.barplot(data=observer_data, x='count', y='observer', palette='mako')
-    plt.title("Top 10 Observers by Number of Observations")
-    plt.xlabel("Number of Observations")
-    plt.ylabel("Observer")
-    plt.show()
+def observer_bias(observer_data):
+    observer_data = _top(observer_data, 'count')
+    fig, ax = plt.subplots()
+    sns.barplot(data=observer_data, x='count', y='observer', palette='mako', ax=ax)
+    ax.set_title("Top 10 Observers by Number of Observations")
+    ax.set_xlabel("Number of Observations")
+    ax.set_ylabel("Observer")
+    return fig
 
 # Visit Patterns
-def visit_patterns(data):
-    visit_data = data['visit'].value_counts().reset_index()
-    visit_data.columns = ['visit', 'count']
-    sns.barplot(data=visit_data, x='visit', y='count', palette='rocket')
-    plt.title("Visit Patterns")
-    plt.xlabel("Visit Count")
-    plt.ylabel("Number of Observations")
-    plt.show()
+def visit_patterns(visit_data):
+    fig, ax = plt.subplots()
+    sns.barplot(data=visit_data, x='visit', y='count', palette='rocket', ax=ax)
+    ax.set_title("Visit Patterns")
+    ax.set_xlabel("Visit Count")
+    ax.set_ylabel("Number of Observations")
+    return fig
 
 # -------------------------------
 # 7. Conservation Insights
 # -------------------------------
 
 # Watchlist Trends
-def watchlist_trends(data):
-    watchlist_data = data['pif_watchlist_status'].value_counts().reset_index()
-    watchlist_data.columns = ['pif_watchlist_status', 'count']
-    sns.barplot(data=watchlist_data, x='pif_watchlist_status', y='count', palette='pastel')
-    plt.title("PIF Watchlist Status Distribution")
-    plt.xlabel("PIF Watchlist Status")
-    plt.ylabel("Number of Observations")
-    plt.show()
+def watchlist_trends(watchlist_data):
+    fig, ax = plt.subplots()
+    sns.barplot(data=watchlist_data, x='pif_watchlist_status', y='count', palette='pastel', ax=ax)
+    ax.set_title("PIF Watchlist Status Distribution")
+    ax.set_xlabel("PIF Watchlist Status")
+    ax.set_ylabel("Number of Observations")
+    return fig
 
 # AOU Code Patterns
-def aou_code_patterns(data):
-    aou_data = data['aou_code'].value_counts().reset_index().head(10)
-    aou_data.columns = ['aou_code', 'count']
-    sns.barplot(data=aou_data, x='count', y='aou_code', palette='coolwarm')
-    plt.title("Top 10 AOU Codes")
-    plt.xlabel("Number of Observations")
-    plt.ylabel("AOU Code")
-    plt.show()
+def aou_code_patterns(aou_data):
+    aou_data = _top(aou_data, 'count')
+    fig, ax = plt.subplots()
+    sns.barplot(data=aou_data, x='count', y='aou_code', palette='coolwarm', ax=ax)
+    ax.set_title("Top 10 AOU Codes")
+    ax.set_xlabel("Number of Observations")
+    ax.set_ylabel("AOU Code")
+    return fig
+
+# Analyses in report order: name -> (aggregation, plot)
+ANALYSES = {
+    'seasonal_trends': (seasonal_trends_table, seasonal_trends),
+    'observation_time_analysis': (observation_time_table, observation_time_analysis),
+    'detection_rate_analysis': (detection_rate_table, detection_rate_analysis),
+    'location_insights': (richness_by_habitat_table, location_insights),
+    'plot_level_analysis': (plot_level_table, plot_level_analysis),
+    'diversity_metrics': (richness_by_habitat_table, diversity_metrics),
+    'activity_patterns': (value_count_table('id_method'), activity_patterns),
+    'sex_ratio': (value_count_table('sex'), sex_ratio),
+    'weather_correlation': (weather_table, weather_correlation),
+    'disturbance_effect': (value_count_table('disturbance'), disturbance_effect),
+    'distance_analysis': (value_count_table('distance'), distance_analysis),
+    'flyover_frequency': (value_count_table('flyover_observed'), flyover_frequency),
+    'observer_bias': (value_count_table('observer'), observer_bias),
+    'visit_patterns': (value_count_table('visit'), visit_patterns),
+    'watchlist_trends': (value_count_table('pif_watchlist_status'), watchlist_trends),
+    'aou_code_patterns': (value_count_table('aou_code'), aou_code_patterns),
+}
 
 # -------------------------------
 # Run EDA Functions
 # -------------------------------
 
-# Temporal Analysis
-seasonal_trends(data)
-observation_time_analysis(data)
-
-# Spatial Analysis
-location_insights(data)
-plot_level_analysis(data)
-
-# Species Analysis
-diversity_metrics(data)
-activity_patterns(data)
-sex_ratio(data)
-
-# Environmental Conditions
-weather_correlation(data)
-disturbance_effect(data)
-
-# Distance and Behavior
-distance_analysis(data)
-flyover_frequency(data)
+if __name__ == "__main__":
+    from dataset import read_compact
 
-# Observer Trends
-observer_bias(data)
-visit_patterns(data)
+    # Load the cleaned dataset and derive season and start/end hour once, vectorized
+    data = add_derived_features(read_compact())
 
-# Conservation Insights
-watchlist_trends(data)
-aou_code_patterns(data)
+    for aggregate, plot in ANALYSES.values():
+        plot(aggregate(data))
+        plt.show()
@@ -0,0 +1,51 @@
+# filter_index.py
+import numpy as np
+import pandas as pd
+
+def build_filter_index(data, columns):
+    """
+    Build an inverted index from column values to packed row bitmaps.
+
+    For each column, every distinct value maps to a NumPy uint8 array holding one bit per
+    row of `data` (np.packbits), so a bitmap costs len(data) / 8 bytes.
+    """
+    bitmaps = {}
+    for col in columns:
+        if col not in data.columns:
+            continue
+        codes, uniques = pd.factorize(data[col], use_na_sentinel=True)
+        bitmaps[col] = {
+            value: np.packbits(codes == code)
+            for code, value in enumerate(uniques)
+        }
+    return {'rows': len(data), 'bitmaps': bitmaps}
+
+def _column_bitmap(index, col, values):
+    """
+    OR together the bitmaps of the selected values of one column.
+    """
+    empty = np.zeros((index['rows'] + 7) // 8, dtype=np.uint8)
+    selected = [index['bitmaps'][col][value] for value in values if value in index['bitmaps'][col]]
+    if not selected:
+        return empty
+    return np.bitwise_or.reduce(selected) if len(selected) > 1 else selected[0]
+
+def resolve_filters(index, filters):
+    """
+    Return the positions of the rows matching the filters.
+
+    `filters` maps columns to the list of accepted values; values within a column are
+    combined with OR and columns with AND. Columns with no selected values are ignored,
+    so they add no cost. Raises KeyError for a filtered column that is not indexed.
+    """
+    mask = None
+    for col, values in filters.items():
+        if not values:
+            continue
+        if col not in index['bitmaps']:
+            raise KeyError(f"Column {col!r} is not indexed")
+        bitmap = _column_bitmap(index, col, values)
+        mask = bitmap if mask is None else mask & bitmap
+    if mask is None:
+        return np.arange(index['rows'])
+    return np.flatnonzero(np.unpackbits(mask, count=index['rows']))
@@ -0,0 +1,96 @@
+# hierarchy.py
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from biodiversity import abundance_matrix
+
+# Location levels from the top down; each plot lies in one admin unit of one habitat
+HIERARCHY = ['location_type', 'admin_unit_code', 'plot_name']
+
+# Id of the node holding every observation, and the separator of node ids ('Forest/ANTI/ANTI-0036')
+ROOT = "All"
+SEPARATOR = "/"
+
+def rollup_tree(data, levels=HIERARCHY, species='scientific_name', weight=None):
+    """
+    Roll observations up the location hierarchy into a tree answering counts, richness and species sets.
+
+    A leaf x species abundance matrix is built once; every higher node is the sum of its
+    leaves' rows (one indicator matrix product per level), so no level rescans `data`.
+    With `weight`, rows are pre-aggregated cells and their `weight` column is summed.
+
+    Returns a dict with 'nodes' (one row per node: id, parent, level, label, depth,
+    observations, richness; the root first, then each level in turn), 'matrix' (the
+    node x species counts, in node order) and 'species' (the species labels).
+    """
+    leaf = levels[-1]
+    matrix, leaves, species_names = abundance_matrix(data, leaf, species, weight)
+    paths = data[levels].dropna().drop_duplicates(leaf).set_index(leaf)[levels[:-1]]
+    paths = paths.reindex(leaves).reset_index().astype(str)
+
+    # Id of every leaf's ancestor at each depth: the path of labels down to it
+    ids = [pd.Series(ROOT, index=paths.index)]
+    for column in levels:
+        ids.append(ids[-1] + SEPARATOR + paths[column])
+
+    frames, blocks = [], []
+    for depth, node_ids in enumerate(ids):
+        codes, unique_ids = pd.factorize(node_ids, sort=True)
+        indicator = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int64), (codes, np.arange(len(codes)))),
+            shape=(len(unique_ids), len(codes)),
+        )
+        blocks.append(indicator @ matrix)
+        first = np.unique(codes, return_index=True)[1]
+        frames.append(pd.DataFrame({
+            'id': unique_ids,
+            'parent': ids[depth - 1].to_numpy()[first] if depth else "",
+            'level': levels[depth - 1] if depth else None,
+            'label': paths[levels[depth - 1]].to_numpy()[first] if depth else ROOT,
+            'depth': depth,
+        }))
+
+    node_matrix = sparse.vstack(blocks, format='csr')
+    node_matrix.eliminate_zeros()
+    nodes = pd.concat(frames, ignore_index=True)
+    nodes['observations'] = np.asarray(node_matrix.sum(axis=1)).ravel()
+    nodes['richness'] = np.diff(node_matrix.indptr)
+    return {'nodes': nodes, 'matrix': node_matrix, 'species': species_names}
+
+def children(tree, node=ROOT):
+    """
+    The child nodes of `node`, most observations first: one drill-down step, read from the tree.
+    """
+    nodes = tree['nodes']
+    return nodes[nodes['parent'] == node].sort_values('observations', ascending=False, kind='stable')
+
+def node_species(tree, node=ROOT):
+    """
+    Observation counts of the species recorded at `node`, largest first.
+    """
+    row = tree['matrix'][np.flatnonzero(tree['nodes']['id'].to_numpy() == node)[0]]
+    counts = pd.Series(row.data, index=tree['species'][row.indices], name='count')
+    return counts.sort_values(ascending=False, kind='stable')
+
+def level_table(tree, level):
+    """
+    Observations and richness per value of one level, merging nodes that share a label.
+
+    An admin unit surveyed in both habitats is one node under each; their species sets
+    are united here, so richness counts each species once. Rows are ordered by label.
+    """
+    nodes = tree['nodes']
+    rows = np.flatnonzero(nodes['level'].to_numpy() == level)
+    codes, labels = pd.factorize(nodes['label'].to_numpy()[rows], sort=True)
+    indicator = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int64), (codes, np.arange(len(rows)))),
+        shape=(len(labels), len(rows)),
+    )
+    merged = indicator @ tree['matrix'][rows]
+    merged.eliminate_zeros()
+    return pd.DataFrame({
+        level: labels,
+        'observations': np.asarray(merged.sum(axis=1)).ravel(),
+        'richness': np.diff(merged.indptr),
+    })
@@ -0,0 +1,292 @@
+# incremental.py
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import data_preprocessing
+import dataset
+import temporal
+from data_preprocessing import (
+    VALIDATION_RULES,
+    clean_data,
+    cleaned_columns,
+    compute_cleaning_stats,
+    merge_summaries,
+    remove_duplicates,
+    rule_failures,
+    standardize_column_names,
+    summarize_partition,
+    valid_rows,
+)
+from dataset import CLEANED_DATASET, write_partitions
+from ingestion import CACHE_DIR, read_workbooks, safe_name
+
+# Modules besides this one whose code decides the cleaned rows and how they are written:
+# cleaning, time parsing and the output schema (dataset.COLUMN_TYPES, to_arrow)
+CLEANING_MODULES = [data_preprocessing, temporal, dataset]
+
+# Manifest of per-sheet fingerprints, statistics summaries and output files
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
+def sheet_fingerprint(data):
+    """
+    Return a hash of a parsed sheet's column names and cell values.
+    """
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(map(str, data.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def cleaning_fingerprint(outlier_mode, rules=VALIDATION_RULES):
+    """
+    Return a hash of everything besides the sheets that decides the cleaned rows.
+
+    It covers the validation rules, the outlier mode and the source of CLEANING_MODULES
+    and of this module, so changing any of them rewrites every sheet instead of keeping
+    stale output.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'rules': rules, 'outlier_mode': outlier_mode}, sort_keys=True, default=str).encode())
+    for path in [module.__file__ for module in CLEANING_MODULES] + [__file__]:
+        with open(path, "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()
+
+def _summary_to_json(summary):
+    rows = [
+        [None if pd.isna(value) else float(value) for value in key] + [int(count)]
+        for key, count in zip(summary.index, summary.to_numpy())
+    ]
+    return {'columns': list(summary.index.names) if not summary.empty else [], 'rows': rows}
+
+def _summary_from_json(stored):
+    if not stored['rows']:
+        return pd.Series(dtype='int64')
+    cells = pd.DataFrame([row[:-1] for row in stored['rows']], columns=stored['columns'], dtype=float)
+    counts = [row[-1] for row in stored['rows']]
+    return pd.Series(counts, index=pd.MultiIndex.from_frame(cells), dtype='int64')
+
+def _stats_to_json(stats):
+    return {
+        'medians': {col: float(value) for col, value in stats['medians'].items()},
+        'outliers': {col: [float(mean), float(std)] for col, (mean, std) in stats['outliers'].items()},
+        'threshold': stats['threshold'],
+    }
+
+def _stats_from_json(stored):
+    return {
+        'medians': stored['medians'],
+        'outliers': {col: tuple(bounds) for col, bounds in stored['outliers'].items()},
+        'threshold': stored['threshold'],
+    }
+
+def _cell_outcome(summary, stats):
+    """
+    Return the filled values and the outlier mask of each summary cell under `stats`.
+    """
+    cells = summary.index.to_frame(index=False).astype(float)
+    # Columns the partition lacks are missing for all of its rows once aligned to the habitat
+    cells = cells.reindex(columns=list(dict.fromkeys(list(cells.columns) + list(stats['medians']))))
+    filled = cells.fillna({col: stats['medians'].get(col, np.nan) for col in cells.columns})
+    keep = np.ones(len(cells), dtype=bool)
+    for col, (mean, std) in stats['outliers'].items():
+        if col in filled.columns:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                keep &= np.abs((filled[col].fillna(0).to_numpy() - mean) / std) < stats['threshold']
+    return filled.to_numpy(), keep
+
+def _stats_change_output(summary, old_stats, new_stats):
+    """
+    Check whether cleaning a partition with `new_stats` instead of `old_stats` changes its rows.
+    """
+    if summary.empty:
+        return False
+    if old_stats is None:
+        return True
+    old_values, old_keep = _cell_outcome(summary, old_stats)
+    new_values, new_keep = _cell_outcome(summary, new_stats)
+    if not np.array_equal(old_keep, new_keep):
+        return True
+    return not np.array_equal(old_values[new_keep], new_values[new_keep], equal_nan=True)
+
+def load_manifest(path=MANIFEST_PATH):
+    """
+    Load the incremental-build manifest, or an empty one if none exists.
+    """
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {'partitions': {}, 'stats': {}, 'columns': None, 'output_path': None}
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """
+    Write the manifest atomically so an interrupted run never leaves a partial file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(manifest, handle)
+    os.replace(temporary, path)
+
+def _dataset_files(path):
+    """
+    Return the Parquet files currently present in the output dataset.
+    """
+    found = set()
+    for root, _, files in os.walk(path):
+        found.update(os.path.join(root, name) for name in files if name.endswith(".parquet"))
+    return found
+
+def _habitat_columns(entries):
+    """
+    Return the columns of a habitat's combined sheets, in the order pd.concat produces them.
+    """
+    non_empty = [entry for entry in entries if entry['rows']] or entries[:1]
+    return list(dict.fromkeys(col for entry in non_empty for col in entry['columns']))
+
+def _stage_sheet(raw, location_type):
+    """
+    Prepare a parsed sheet the way load_data and clean_data do before computing statistics.
+    """
+    staged = raw.copy()
+    staged['Location_Type'] = location_type
+    return remove_duplicates(standardize_column_names(staged))
+
+def run_incremental(forest_file, grassland_file, output_path=CLEANED_DATASET,
+                    cache_dir=CACHE_DIR, manifest_path=MANIFEST_PATH, max_workers=None,
+                    outlier_mode='sequential', quarantine=None):
+    """
+    Update the cleaned dataset, re-cleaning and rewriting only the sheets that changed.
+
+    Each sheet's medians/z-score inputs are kept in the manifest as a mergeable summary,
+    so each habitat's global cleaning statistics are recomputed without re-cleaning
+    unchanged sheets. Unchanged sheets are only rewritten when the new statistics alter
+    their cleaned rows, which keeps the output identical to a full rebuild; a change of
+    the validation rules, outlier mode or cleaning code rewrites them all. Sheets are
+    assumed to hold distinct admin units, so duplicates are removed within each sheet.
+    Rows failing validation in any sheet, changed or not, are appended to `quarantine`
+    if given, as by clean_data.
+    """
+    logging.info("Starting incremental data processing...")
+    manifest = load_manifest(manifest_path)
+    cleaning = cleaning_fingerprint(outlier_mode)
+    workbooks = read_workbooks([forest_file, grassland_file], cache_dir=cache_dir, max_workers=max_workers)
+
+    # Fingerprint every sheet and summarize the ones that changed
+    entries, staged = {}, {}
+    for path, location_type in ((forest_file, 'Forest'), (grassland_file, 'Grassland')):
+        for sheet, raw in workbooks[path].items():
+            key = f"{location_type}/{sheet}"
+            fingerprint = sheet_fingerprint(raw)
+            previous = manifest['partitions'].get(key)
+            if previous and previous['fingerprint'] == fingerprint:
+                entries[key] = previous
+                continue
+            staged[key] = _stage_sheet(raw, location_type)
+            entries[key] = {
+                'location_type': location_type,
+                'sheet': sheet,
+                'fingerprint': fingerprint,
+                'rows': len(staged[key]),
+                'columns': list(staged[key].columns),
+                'summary': _summary_to_json(summarize_partition(staged[key][valid_rows(staged[key])])),
+                'files': previous['files'] if previous else [],
+            }
+    logging.info(f"{len(staged)} of {len(entries)} sheet(s) changed")
+
+    habitats = {
+        location_type: [key for key in entries if entries[key]['location_type'] == location_type]
+        for location_type in ('Forest', 'Grassland')
+    }
+    habitat_columns = {
+        location_type: _habitat_columns([entries[key] for key in keys])
+        for location_type, keys in habitats.items()
+    }
+    forest_columns = cleaned_columns(habitat_columns['Forest'])
+    grassland_columns = cleaned_columns(habitat_columns['Grassland'])
+    output_columns = [col for col in forest_columns if col in grassland_columns]
+
+    # Rewrite everything when the layout changed or the output no longer matches the manifest
+    recorded_files = {file for entry in manifest['partitions'].values() for file in entry['files']}
+    rebuild = (
+        manifest['output_path'] != output_path
+        or manifest['columns'] != output_columns
+        or manifest.get('habitat_columns') != habitat_columns
+        or manifest.get('cleaning') != cleaning
+        or _dataset_files(output_path) != recorded_files
+    )
+    if rebuild:
+        logging.info("Output does not match the manifest; rewriting all sheets.")
+        if os.path.isdir(output_path):
+            shutil.rmtree(output_path)
+        for entry in entries.values():
+            entry['files'] = []
+
+    # Recompute each habitat's statistics from the merged summaries
+    stats, rewrite = {}, set(staged)
+    for location_type, keys in habitats.items():
+        summaries = {key: _summary_from_json(entries[key]['summary']) for key in keys}
+        stats[location_type] = compute_cleaning_stats(merge_summaries(summaries.values()), outlier_mode=outlier_mode)
+        previous = manifest['stats'].get(location_type)
+        old_stats = None if rebuild or previous is None else _stats_from_json(previous)
+        for key in keys:
+            if rebuild or _stats_change_output(summaries[key], old_stats, stats[location_type]):
+                rewrite.add(key)
+
+    # Drop the output of sheets that were removed or are about to be rewritten
+    for key, entry in manifest['partitions'].items():
+        if key not in entries or key in rewrite:
+            for file in entry['files']:
+                if os.path.exists(file):
+                    os.remove(file)
+            if key in entries:
+                entries[key]['files'] = []
+
+    # Re-clean and write the affected sheets
+    sources = {location_type: path for path, location_type in ((forest_file, 'Forest'), (grassland_file, 'Grassland'))}
+    for key in sorted(rewrite):
+        entry = entries[key]
+        location_type = entry['location_type']
+        if key not in staged:
+            staged[key] = _stage_sheet(workbooks[sources[location_type]][entry['sheet']], location_type)
+        if not entry['rows']:
+            continue
+        data = staged[key].reindex(columns=habitat_columns[location_type])
+        rejected = []
+        cleaned = clean_data(data, stats[location_type], quarantine=rejected)[output_columns]
+        entry['quarantined'] = sum(len(rows) for rows in rejected)
+        if quarantine is not None:
+            quarantine.extend(rejected)
+        entry['files'] = write_partitions(cleaned, output_path,
+                                          basename_template=f"{safe_name(entry['sheet'])}-{{i}}.parquet")
+    logging.info(f"Rewrote {len(rewrite)} sheet(s) into {output_path}")
+
+    # Rows failing validation in the sheets kept as they were: the rules are row-local,
+    # so they are checked again without re-cleaning, only in sheets known to have some
+    if quarantine is not None:
+        for key in sorted(set(entries) - rewrite):
+            entry = entries[key]
+            if not entry.get('quarantined'):
+                continue
+            location_type = entry['location_type']
+            data = _stage_sheet(workbooks[sources[location_type]][entry['sheet']], location_type)
+            data = data.reindex(columns=habitat_columns[location_type])
+            failures = rule_failures(data)
+            invalid = failures.any(axis=1).to_numpy()
+            quarantine.append(data[invalid].join(failures[invalid]))
+
+    save_manifest({
+        'partitions': entries,
+        'stats': {location_type: _stats_to_json(value) for location_type, value in stats.items()},
+        'columns': output_columns,
+        'habitat_columns': habitat_columns,
+        'cleaning': cleaning,
+        'output_path': output_path,
+    }, manifest_path)
+    logging.info("Incremental data processing complete.")
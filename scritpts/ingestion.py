@@ -0,0 +1,244 @@
+# ingestion.py
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Parsed sheets are cached here, keyed by workbook content hash and sheet name
+CACHE_DIR = os.path.join("data", "cache")
+
+# Workbook versions (content hashes) kept in the cache; older entries are evicted
+CACHE_KEEP = 4
+
+# Cache files of one workbook version start with the first 16 hex digits of its hash
+_CACHE_ENTRY = re.compile(r"^([0-9a-f]{16})_")
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """
+    Return the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def safe_name(name):
+    """
+    Make a name (a sheet, a report group) safe to use inside a file name.
+
+    Unsafe characters become underscores and a short hash of the raw name is appended,
+    so names that only differ in those characters ("A B", "A_B") get different files.
+    """
+    digest = hashlib.sha256(name.encode()).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}-{digest}"
+
+def sheet_cache_path(cache_dir, fingerprint, sheet):
+    """
+    Return the cache file used for one sheet of a workbook.
+    """
+    return os.path.join(cache_dir, f"{fingerprint[:16]}_{safe_name(sheet)}.parquet")
+
+def _sheet_list_path(cache_dir, fingerprint):
+    return os.path.join(cache_dir, f"{fingerprint[:16]}_sheets.json")
+
+def _read_sheet_list(cache_dir, fingerprint):
+    """
+    Return the cached sheet names of a workbook, or None if they are not cached.
+    """
+    try:
+        with open(_sheet_list_path(cache_dir, fingerprint)) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path, write):
+    """
+    Call `write` on a temporary file next to `path` and move it into place.
+
+    Readers treat an existing cache file as complete, so a crash or a concurrent run
+    must never leave a partial file under the final name.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+def _write_sheet(data, path):
+    """
+    Write a parsed sheet to the cache; sheets Arrow cannot represent are skipped.
+    """
+    try:
+        _write_atomic(path, lambda temporary: data.to_parquet(temporary, index=False))
+    except (ValueError, TypeError) as error:
+        logging.warning(f"Could not cache {path}: {error}")
+
+def _write_sheet_list(sheets, path):
+    """
+    Write a workbook's sheet names to the cache.
+    """
+    def write(temporary):
+        with open(temporary, "w") as handle:
+            json.dump(sheets, handle)
+    _write_atomic(path, write)
+
+def evict_cache(cache_dir=CACHE_DIR, keep=CACHE_KEEP, in_use=()):
+    """
+    Remove the cache files of all but the `keep` most recently used workbook versions.
+
+    Versions whose fingerprints are in `in_use` are never removed. Other files in the
+    directory (such as the incremental manifest) are left alone.
+    """
+    entries = {}
+    for name in os.listdir(cache_dir):
+        match = _CACHE_ENTRY.match(name)
+        if match:
+            path = os.path.join(cache_dir, name)
+            entries.setdefault(match.group(1), []).append(path)
+    protected = {fingerprint[:16] for fingerprint in in_use}
+    by_recency = sorted(entries, key=lambda key: max(os.path.getmtime(path) for path in entries[key]), reverse=True)
+    evicted = [key for key in by_recency[keep:] if key not in protected]
+    for key in evicted:
+        for path in entries[key]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    if evicted:
+        logging.info(f"Evicted {len(evicted)} old workbook version(s) from {cache_dir}")
+    return evicted
+
+def _parse_sheets(path, sheets, cache_dir, fingerprint, return_data=True):
+    """
+    Open a workbook once, parse the given sheets and cache each of them.
+    """
+    with pd.ExcelFile(path) as workbook:
+        parsed = {sheet: workbook.parse(sheet) for sheet in sheets}
+    if cache_dir:
+        for sheet, data in parsed.items():
+            _write_sheet(data, sheet_cache_path(cache_dir, fingerprint, sheet))
+    return parsed if return_data else {}
+
+def _split(items, parts):
+    """
+    Split a list into at most `parts` contiguous batches of similar size.
+    """
+    parts = max(1, min(parts, len(items)))
+    size, extra = divmod(len(items), parts)
+    batches, start = [], 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        batches.append(items[start:end])
+        start = end
+    return batches
+
+def _sheet_names(path, cache_dir, fingerprint):
+    """
+    Return a workbook's sheet names, from the cache when possible.
+    """
+    sheets = _read_sheet_list(cache_dir, fingerprint) if cache_dir else None
+    if sheets is None:
+        with pd.ExcelFile(path) as workbook:
+            sheets = workbook.sheet_names
+        if cache_dir:
+            _write_sheet_list(sheets, _sheet_list_path(cache_dir, fingerprint))
+    elif cache_dir:
+        # Mark the version as recently used, so evict_cache keeps it
+        os.utime(_sheet_list_path(cache_dir, fingerprint))
+    return sheets
+
+def _parse_in_pool(tasks, cache_dir, max_workers, return_data):
+    """
+    Run (path, sheets, fingerprint) parse tasks, in a process pool when there is more than one.
+
+    Yields (path, {sheet: DataFrame}) pairs; the dicts are empty unless `return_data` is set.
+    """
+    if len(tasks) == 1 or max_workers == 1:
+        for path, batch, fingerprint in tasks:
+            yield path, _parse_sheets(path, batch, cache_dir, fingerprint, return_data)
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+            futures = [
+                (path, pool.submit(_parse_sheets, path, batch, cache_dir, fingerprint, return_data))
+                for path, batch, fingerprint in tasks
+            ]
+            for path, future in futures:
+                yield path, future.result()
+
+def read_workbooks(paths, cache_dir=CACHE_DIR, max_workers=None):
+    """
+    Read every sheet of the given Excel workbooks.
+
+    Sheets already cached for the workbook's current contents are read from the
+    columnar cache. The remaining sheets are parsed across a process pool, with
+    each worker opening a workbook once for its whole batch of sheets. Cache entries
+    of older workbook versions are then evicted (see evict_cache).
+    Returns a dict mapping each path to an ordered {sheet_name: DataFrame} dict.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    results, tasks, fingerprints = {}, [], []
+    for path in paths:
+        fingerprint = file_fingerprint(path)
+        fingerprints.append(fingerprint)
+        sheets = _sheet_names(path, cache_dir, fingerprint)
+
+        results[path] = dict.fromkeys(sheets)
+        missing = []
+        for sheet in sheets:
+            cached = sheet_cache_path(cache_dir, fingerprint, sheet) if cache_dir else None
+            if cached and os.path.exists(cached):
+                results[path][sheet] = pd.read_parquet(cached)
+            else:
+                missing.append(sheet)
+
+        logging.info(f"{path}: {len(sheets) - len(missing)} cached sheet(s), {len(missing)} to parse")
+        for batch in _split(missing, max_workers) if missing else []:
+            tasks.append((path, batch, fingerprint))
+
+    for path, parsed in _parse_in_pool(tasks, cache_dir, max_workers, return_data=True):
+        results[path].update(parsed)
+
+    if cache_dir:
+        evict_cache(cache_dir, in_use=fingerprints)
+    return results
+
+def cache_workbooks(paths, cache_dir=CACHE_DIR, max_workers=None):
+    """
+    Make sure every sheet of the given workbooks is in the columnar cache, without loading them.
+
+    Returns a dict mapping each path to an ordered {sheet_name: cache_file} dict, for
+    consumers that read the cached sheets in chunks. Older workbook versions are evicted
+    as by read_workbooks.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    os.makedirs(cache_dir, exist_ok=True)
+
+    results, tasks, fingerprints = {}, [], []
+    for path in paths:
+        fingerprint = file_fingerprint(path)
+        fingerprints.append(fingerprint)
+        sheets = _sheet_names(path, cache_dir, fingerprint)
+        results[path] = {sheet: sheet_cache_path(cache_dir, fingerprint, sheet) for sheet in sheets}
+        missing = [sheet for sheet, cached in results[path].items() if not os.path.exists(cached)]
+        for batch in _split(missing, max_workers) if missing else []:
+            tasks.append((path, batch, fingerprint))
+
+    for _ in _parse_in_pool(tasks, cache_dir, max_workers, return_data=False):
+        pass
+
+    for path, sheets in results.items():
+        for sheet, cached in sheets.items():
+            if not os.path.exists(cached):
+                raise ValueError(f"Sheet {sheet!r} of {path} could not be cached as Parquet")
+    evict_cache(cache_dir, in_use=fingerprints)
+    return results
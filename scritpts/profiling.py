@@ -0,0 +1,142 @@
+# profiling.py
+import cProfile
+import functools
+import json
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Peak RSS comes from getrusage, which only exists on Unix; elsewhere it is reported as None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# pyinstrument is optional; cProfile from the standard library is always available
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+# Most recent stage records kept in memory (a long-running dashboard keeps only the tail)
+MAX_RECORDS = 10000
+
+_records = deque(maxlen=MAX_RECORDS)
+_active = threading.local()
+
+def peak_rss_bytes():
+    """
+    Return the peak resident set size of this process so far, in bytes, or None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _rows(value):
+    """
+    Row count of a frame, or the total of a tuple of frames; None for anything else.
+    """
+    if isinstance(value, tuple):
+        counts = [_rows(item) for item in value]
+        return None if None in counts else sum(counts)
+    return len(value) if hasattr(value, 'columns') else None
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Measure one pipeline or dashboard stage.
+
+    Yields the stage's record; set record['rows_out'] inside the block when it is known.
+    On exit the record gets the wall time, the CPU time of the calling thread (so
+    concurrent sessions of a threaded server do not inflate each other's sections, while
+    work in helper thread pools is not counted), the growth of the process-wide peak RSS
+    and whether the stage raised, is logged as one JSON line and kept for stage_records.
+    Stages nest: a stage inside another is named 'outer/inner'.
+    """
+    parents = getattr(_active, 'stack', None)
+    if parents is None:
+        parents = _active.stack = []
+    record = {'stage': "/".join(parents + [name]), 'rows_in': rows_in, 'rows_out': None}
+    parents.append(name)
+    peak_before = peak_rss_bytes()
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield record
+        record['failed'] = False
+    except BaseException:
+        record['failed'] = True
+        raise
+    finally:
+        parents.pop()
+        record['wall_seconds'] = round(time.perf_counter() - wall, 6)
+        record['cpu_seconds'] = round(time.thread_time() - cpu, 6)
+        # The peak RSS is process-wide: other threads' allocations during the stage count too
+        peak_after = peak_rss_bytes()
+        record['process_peak_rss_delta_mb'] = None if peak_before is None else round((peak_after - peak_before) / 2**20, 3)
+        _records.append(record)
+        logging.info(f"stage {json.dumps(record)}")
+
+def profiled(name=None):
+    """
+    Decorator measuring each call of a function as a stage.
+
+    Rows in are counted from the first argument and rows out from the result when they
+    are DataFrames (or tuples of DataFrames).
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__, rows_in=_rows(args[0]) if args else None) as record:
+                result = func(*args, **kwargs)
+                record['rows_out'] = _rows(result)
+            return result
+        return wrapper
+    return decorate
+
+def stage_records():
+    """
+    Return the stage records collected so far, oldest first.
+    """
+    return list(_records)
+
+def write_stage_report(path):
+    """
+    Write the collected stage records to `path` as a JSON list.
+    """
+    with open(path, "w") as handle:
+        json.dump(stage_records(), handle, indent=2)
+    logging.info(f"Wrote {len(_records)} stage records to {path}")
+
+@contextmanager
+def profile_to(path):
+    """
+    Profile the block and write the result to `path`.
+
+    An '.html' path gets a pyinstrument report (if pyinstrument is installed); anything
+    else gets cProfile statistics, readable with pstats or snakeviz.
+    """
+    if path.endswith(".html"):
+        if pyinstrument is None:
+            raise ImportError("HTML profiles need the pyinstrument package (pip install pyinstrument)")
+        profiler = pyinstrument.Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, "w") as handle:
+                handle.write(profiler.output_html())
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path)
+    logging.info(f"Wrote profile to {path}")
@@ -0,0 +1,138 @@
+# report.py
+import argparse
+import html
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Render without a display; must be set before pyplot is imported
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from analytics import add_derived_features
+from dataset import CLEANED_DATASET, read_compact
+from eda import ANALYSES
+from ingestion import safe_name
+
+# Reports are written here, one directory per report
+REPORT_DIR = "reports"
+
+FORMATS = ['png', 'svg', 'html']
+
+# Columns a report can be split by
+GROUP_COLUMNS = ['admin_unit_code', 'location_type']
+
+# Column holding the report group while the tables are aggregated
+GROUP_KEY = 'report_group'
+
+def aggregate_reports(data, analyses, by=None):
+    """
+    Compute the tables of every report with one aggregation per analysis.
+
+    Each aggregation runs once over the whole dataset with the `by` column as an extra
+    key, and its result is split per group. Returns {group: {analysis: table}}; without
+    `by`, there is a single report named 'all'.
+    """
+    reports = {}
+    if by is not None:
+        # Group through a copy of the column, so analyses keyed by `by` itself keep it
+        data = data.assign(**{GROUP_KEY: data[by]})
+    for name in analyses:
+        aggregate, _ = ANALYSES[name]
+        if by is None:
+            reports.setdefault('all', {})[name] = aggregate(data)
+            continue
+        for group, table in aggregate(data, [GROUP_KEY]).groupby(GROUP_KEY, observed=True):
+            reports.setdefault(group, {})[name] = table.drop(columns=GROUP_KEY).reset_index(drop=True)
+    return reports
+
+def render_figure(name, table, path_prefix, formats):
+    """
+    Plot one analysis table and save it in the given formats.
+
+    Returns the SVG markup when 'html' is requested, for inlining into the report page.
+    """
+    _, plot = ANALYSES[name]
+    fig = plot(table)
+    try:
+        for fmt in formats:
+            if fmt in ('png', 'svg'):
+                fig.savefig(f"{path_prefix}.{fmt}", format=fmt, bbox_inches='tight')
+        if 'html' in formats:
+            buffer = io.StringIO()
+            fig.savefig(buffer, format='svg', bbox_inches='tight')
+            return buffer.getvalue()
+    finally:
+        plt.close(fig)
+    return None
+
+def _write_html(path, title, figures):
+    """
+    Write a standalone HTML page with the figures' SVG inlined in report order.
+    """
+    body = "\n".join(
+        f"<section><h2>{html.escape(name)}</h2>\n{svg[svg.find('<svg'):]}</section>"
+        for name, svg in figures
+    )
+    with open(path, "w") as handle:
+        handle.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title></head>\n"
+                     f"<body><h1>{html.escape(title)}</h1>\n{body}\n</body></html>\n")
+
+def generate_reports(data, analyses=None, by=None, formats=('png',), output_dir=REPORT_DIR, max_workers=None):
+    """
+    Write one report per group of `by` (or a single report) for the chosen analyses.
+
+    The tables are aggregated once in this process; only plotting and saving the figures
+    is fanned out across a process pool. Returns {group: report directory}.
+    """
+    analyses = list(analyses or ANALYSES)
+    max_workers = max_workers or os.cpu_count() or 1
+    reports = aggregate_reports(add_derived_features(data), analyses, by)
+    logging.info(f"Rendering {len(reports)} report(s) x {len(analyses)} analyses with {max_workers} worker(s)...")
+
+    tasks = []
+    directories = {}
+    for group, tables in reports.items():
+        directories[group] = os.path.join(output_dir, safe_name(str(group)))
+        os.makedirs(directories[group], exist_ok=True)
+        for name, table in tables.items():
+            if len(table):
+                tasks.append((group, name, table, os.path.join(directories[group], name)))
+
+    if max_workers == 1:
+        results = [render_figure(name, table, prefix, formats) for _, name, table, prefix in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(render_figure, name, table, prefix, formats) for _, name, table, prefix in tasks]
+            results = [future.result() for future in futures]
+
+    if 'html' in formats:
+        pages = {group: [] for group in reports}
+        for (group, name, _, _), svg in zip(tasks, results):
+            pages[group].append((name, svg))
+        for group, figures in pages.items():
+            title = f"Bird Observation Report: {group}" if by else "Bird Observation Report"
+            _write_html(os.path.join(directories[group], "index.html"), title, figures)
+
+    logging.info(f"Wrote {len(tasks)} figure(s) to {output_dir}")
+    return directories
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(description="Render EDA reports headlessly.")
+    parser.add_argument("--input", default=CLEANED_DATASET, help="Cleaned dataset to report on.")
+    parser.add_argument("--output", default=REPORT_DIR, help="Directory the reports are written to.")
+    parser.add_argument("--by", choices=GROUP_COLUMNS,
+                        help="Write one report per value of this column instead of a single report.")
+    parser.add_argument("--analyses", nargs="+", choices=list(ANALYSES),
+                        help="Analyses to include (default: all).")
+    parser.add_argument("--format", nargs="+", choices=FORMATS, default=['png'], dest="formats",
+                        help="Output formats; 'html' writes an index.html page per report.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of rendering processes (default: number of CPUs).")
+    args = parser.parse_args()
+
+    generate_reports(read_compact(args.input), args.analyses, args.by, args.formats, args.output, args.workers)
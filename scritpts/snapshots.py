@@ -0,0 +1,170 @@
+# snapshots.py
+import json
+import logging
+import os
+import shutil
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from dataset import CLEANED_DATASET, publish_shared
+from ingestion import file_fingerprint
+
+# Published dataset versions, one immutable directory each, plus the pointer to the current one
+SNAPSHOT_DIR = os.path.join("data", "snapshots")
+CURRENT_POINTER = "CURRENT.json"
+
+# Files inside a snapshot directory
+SNAPSHOT_DATA = "data.arrow"
+SNAPSHOT_MANIFEST = "manifest.json"
+
+# Database file of each SQL backend engine; the engine is picked when the snapshot is published
+SNAPSHOT_DATABASES = {'sqlite': "observations.sqlite", 'duckdb': "observations.duckdb"}
+
+def _write_json(path, payload):
+    """
+    Write a JSON file atomically: readers see the previous or the new contents, never a mix.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(payload, handle, indent=2)
+    os.replace(temporary, path)
+
+def _distinct(table, column):
+    """
+    Sorted distinct non-null values of a (possibly dictionary-encoded) column.
+    """
+    values = table.column(column).combine_chunks()
+    if pa.types.is_dictionary(values.type):
+        values = values.dictionary_decode()
+    return sorted(value for value in pc.unique(values).to_pylist() if value is not None)
+
+def dataset_summary(path):
+    """
+    Compute the dashboard's unfiltered key metrics and filter options from a snapshot's Arrow file.
+
+    The result is small enough to keep in the manifest, so a starting dashboard can show
+    them before it has loaded the data.
+    """
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        return {
+            'observations': table.num_rows,
+            'species': len(_distinct(table, 'scientific_name')),
+            'observers': len(_distinct(table, 'observer')),
+            'options': {column: _distinct(table, column) for column in ('common_name', 'observer')},
+        }
+
+def publish_snapshot(source=CLEANED_DATASET, snapshot_dir=SNAPSHOT_DIR, keep=3, database=None):
+    """
+    Publish the cleaned dataset at `source` as a new immutable snapshot and make it current.
+
+    The snapshot (the memory-mappable Arrow file and a manifest with its row count, content
+    hash and dataset_summary) is built in a temporary directory and renamed into place; only then is
+    the CURRENT.json pointer replaced, atomically. If the contents equal the current
+    snapshot, nothing is published and readers are not asked to reload. Snapshots beyond
+    the `keep` most recent are removed, except the current one. Returns the manifest of
+    the snapshot now current. With `database` ('sqlite' or 'duckdb'), the snapshot also
+    holds an indexed copy of the data in that engine for the dashboard's SQL backend.
+    """
+    database_name = SNAPSHOT_DATABASES[database] if database else None
+    os.makedirs(snapshot_dir, exist_ok=True)
+    staging = os.path.join(snapshot_dir, f".staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    data_file = os.path.join(staging, SNAPSHOT_DATA)
+    rows = publish_shared(source, data_file)
+    digest = file_fingerprint(data_file)
+    current = current_snapshot(snapshot_dir)
+    unchanged = current is not None and current['files'].get(SNAPSHOT_DATA) == digest
+    if unchanged and 'summary' in current and (not database or database_name in current['files']):
+        shutil.rmtree(staging)
+        logging.info(f"Dataset unchanged; snapshot {current['version']} stays current")
+        return current
+
+    files = {SNAPSHOT_DATA: digest}
+    if database:
+        from sql_backend import build_database
+
+        database_file = os.path.join(staging, database_name)
+        build_database(database_file, source)
+        files[database_name] = file_fingerprint(database_file)
+
+    version = f"{time.strftime('%Y%m%dT%H%M%S')}-{digest[:12]}"
+    manifest = {
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'source': source,
+        'rows': rows,
+        'files': files,
+        'summary': dataset_summary(data_file),
+    }
+    _write_json(os.path.join(staging, SNAPSHOT_MANIFEST), manifest)
+
+    target = os.path.join(snapshot_dir, version)
+    if os.path.exists(target):
+        # Same contents published within the same second: the existing snapshot is identical
+        shutil.rmtree(staging)
+    else:
+        os.rename(staging, target)
+    _write_json(os.path.join(snapshot_dir, CURRENT_POINTER), {'version': version})
+    logging.info(f"Published snapshot {version} ({rows} rows)")
+
+    prune_snapshots(snapshot_dir, keep)
+    return manifest
+
+def current_snapshot(snapshot_dir=SNAPSHOT_DIR):
+    """
+    Return the manifest of the current snapshot, with its 'path', or None if nothing is published.
+    """
+    try:
+        with open(os.path.join(snapshot_dir, CURRENT_POINTER)) as handle:
+            version = json.load(handle)['version']
+        with open(os.path.join(snapshot_dir, version, SNAPSHOT_MANIFEST)) as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError, KeyError):
+        return None
+    manifest['path'] = os.path.join(snapshot_dir, version, SNAPSHOT_DATA)
+    return manifest
+
+def snapshot_database(data_path):
+    """
+    Return the path of the SQL database published next to a snapshot's data file, or None.
+    """
+    for name in SNAPSHOT_DATABASES.values():
+        path = os.path.join(os.path.dirname(data_path), name)
+        if os.path.exists(path):
+            return path
+    return None
+
+def snapshot_signature(snapshot_dir=SNAPSHOT_DIR):
+    """
+    Return a cheap signature of the current pointer (mtime and size), or None if there is none.
+
+    It changes whenever a snapshot is published, so readers can poll it with one stat call
+    and only read the manifest when it differs from the one they loaded.
+    """
+    try:
+        stat = os.stat(os.path.join(snapshot_dir, CURRENT_POINTER))
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def prune_snapshots(snapshot_dir=SNAPSHOT_DIR, keep=3):
+    """
+    Remove all but the `keep` most recent snapshots, never the current one.
+
+    Processes still mapping a removed snapshot keep reading it; its disk space is
+    released once they let go of it.
+    """
+    current = current_snapshot(snapshot_dir)
+    versions = sorted(
+        (name for name in os.listdir(snapshot_dir)
+         if os.path.isfile(os.path.join(snapshot_dir, name, SNAPSHOT_MANIFEST))),
+        reverse=True,
+    )
+    for version in versions[keep:]:
+        if current is None or version != current['version']:
+            shutil.rmtree(os.path.join(snapshot_dir, version), ignore_errors=True)
@@ -0,0 +1,213 @@
+# sql_backend.py
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from cube import CUBOIDS, FILTER_DIMENSIONS
+from dataset import CLEANED_DATASET, read_dataset
+from temporal import SURVEY_KEYS, hour_of_day
+
+# DuckDB is optional; SQLite from the standard library is always available
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+TABLE = "observations"
+
+# Columns loaded into the database; the time-of-day objects are covered by the seconds columns
+DATABASE_COLUMNS = [
+    'location_type', 'admin_unit_code', 'plot_name', 'date', 'year', 'month', 'visit',
+    'observer', 'common_name', 'scientific_name', 'aou_code', 'distance', 'flyover_observed',
+    'sky', 'wind', 'start_seconds', 'end_seconds',
+]
+
+# Column types SQLite does not keep, restored on query results to match the in-memory cube
+RESULT_TYPES = {'flyover_observed': 'bool', 'start_hour': 'Int8'}
+
+# Indexed columns: the dashboard filters plus the ones charts narrow on
+INDEXED_COLUMNS = ['location_type', 'common_name', 'observer', 'plot_name', 'date']
+
+def build_database(path, source=CLEANED_DATASET):
+    """
+    Load the cleaned dataset at `source` into an embedded database file at `path`.
+
+    The engine follows the extension: '.duckdb' uses DuckDB (if installed), anything
+    else SQLite. The table gets a derived start_hour column and one index per
+    INDEXED_COLUMNS entry. The database is built next to `path` (under a temporary name
+    with the same extension) and moved into place. Returns the number of rows loaded.
+    """
+    data = read_dataset(source, columns=DATABASE_COLUMNS)
+    data = data.assign(
+        date=data['date'].dt.strftime('%Y-%m-%d'),
+        start_hour=hour_of_day(data['start_seconds']),
+        flyover_observed=data['flyover_observed'].astype('int8'),
+    )
+    for col in data.columns:
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            data[col] = data[col].astype(object)
+
+    root, extension = os.path.splitext(path)
+    temporary = f"{root}.{os.getpid()}.tmp{extension}"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    connection = _open(temporary, read_only=False)
+    try:
+        if _is_duckdb(path):
+            connection.register('frame', data)
+            connection.execute(f"CREATE TABLE {TABLE} AS SELECT * FROM frame")
+        else:
+            data.to_sql(TABLE, connection, index=False)
+        for col in INDEXED_COLUMNS:
+            connection.execute(f"CREATE INDEX idx_{col} ON {TABLE} ({col})")
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(temporary, path)
+    logging.info(f"Loaded {len(data)} rows into {path}")
+    return len(data)
+
+def _is_duckdb(path):
+    return path.endswith(".duckdb")
+
+def _open(path, read_only=True):
+    if _is_duckdb(path):
+        if duckdb is None:
+            raise ImportError("DuckDB databases need the duckdb package (pip install duckdb)")
+        return duckdb.connect(path, read_only=read_only)
+    if read_only:
+        # Pooled connections are handed from thread to thread, one borrower at a time
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+    return sqlite3.connect(path)
+
+# Idle read-only connections per database file, shared by the threads of this process.
+# Each snapshot version has its own database file, so the pools are per version.
+_pools = {}
+_pools_lock = threading.Lock()
+
+@contextmanager
+def connection(path):
+    """
+    Borrow a read-only connection to the database at `path` from the process pool.
+
+    A connection is opened only when every pooled one is in use, and goes back to the
+    pool afterwards, so concurrent sessions never share a connection at the same time.
+    """
+    with _pools_lock:
+        pool = _pools.setdefault(path, queue.SimpleQueue())
+    try:
+        handle = pool.get_nowait()
+    except queue.Empty:
+        handle = _open(path)
+    try:
+        yield handle
+    finally:
+        # A connection borrowed before its database was retired is closed, not pooled
+        with _pools_lock:
+            retired = _pools.get(path) is not pool
+        if retired:
+            handle.close()
+        else:
+            pool.put(handle)
+
+def retire_connections(keep=()):
+    """
+    Close the pooled connections of every database except those in `keep`.
+
+    Called when the dashboard swaps in a new snapshot, so the databases of old versions
+    are not held open (and the space of pruned snapshots is released). Connections in
+    use at that moment are closed when they are handed back.
+    """
+    with _pools_lock:
+        retired = [path for path in _pools if path not in keep]
+        pools = [_pools.pop(path) for path in retired]
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+    if retired:
+        logging.info(f"Closed the connections to {len(retired)} retired database(s)")
+
+def query(path, sql, params=()):
+    """
+    Run a parameterized query on a pooled connection and return the result as a DataFrame.
+    """
+    with connection(path) as handle:
+        cursor = handle.execute(sql, list(params))
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+    return pd.DataFrame(rows, columns=columns)
+
+def table_columns(path):
+    """
+    Return the column names of the observations table.
+    """
+    return list(query(path, f"SELECT * FROM {TABLE} LIMIT 0").columns)
+
+def _where(filters):
+    """
+    Build a parameterized WHERE clause from {filter dimension: accepted values}.
+
+    Only FILTER_DIMENSIONS can be filtered on, so column names never come from user input.
+    """
+    clauses, params = [], []
+    for dimension, values in filters.items():
+        if not values:
+            continue
+        if dimension not in FILTER_DIMENSIONS:
+            raise KeyError(f"Column {dimension!r} is not a filter dimension")
+        clauses.append(f"{dimension} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+def cuboid_cells(path, name, filters):
+    """
+    Answer a cuboid slice with one parameterized GROUP BY query.
+
+    Returns the same cells as cube.slice_cuboid on the in-memory cube: one row per
+    combination of FILTER_DIMENSIONS and the cuboid's dimensions with a 'count' column.
+    """
+    keys = FILTER_DIMENSIONS + [dim for dim in CUBOIDS[name] if dim not in FILTER_DIMENSIONS]
+    where, params = _where(filters)
+    columns = ", ".join(keys)
+    cells = query(path, f"SELECT {columns}, COUNT(*) AS count FROM {TABLE} {where} GROUP BY {columns}", params)
+    return cells.astype({col: dtype for col, dtype in RESULT_TYPES.items() if col in cells.columns})
+
+def available_cuboids(path):
+    """
+    Return the names of the cuboids whose columns are all in the database.
+    """
+    columns = set(table_columns(path))
+    return {name for name, dims in CUBOIDS.items() if columns.issuperset(FILTER_DIMENSIONS + dims)}
+
+def distinct_values(path, column):
+    """
+    Return the distinct non-null values of a filter dimension, sorted.
+    """
+    if column not in FILTER_DIMENSIONS:
+        raise KeyError(f"Column {column!r} is not a filter dimension")
+    sql = f"SELECT DISTINCT {column} FROM {TABLE} WHERE {column} IS NOT NULL ORDER BY {column}"
+    return query(path, sql)[column].tolist()
+
+def survey_effort(path, by=()):
+    """
+    Survey effort per start hour and group, like temporal.survey_effort, computed in the database.
+    """
+    by = [col for col in by if col in FILTER_DIMENSIONS]
+    keys = ", ".join(SURVEY_KEYS)
+    groups = ", ".join(['start_hour', *by])
+    sql = (
+        f"SELECT {groups}, COUNT(*) AS surveys, SUM((end_seconds - start_seconds) / 60.0) AS survey_minutes "
+        f"FROM (SELECT {keys}, MIN(end_seconds) AS end_seconds, MIN(start_hour) AS start_hour"
+        f"{''.join(f', MIN({col}) AS {col}' for col in by)} "
+        f"FROM {TABLE} WHERE start_seconds IS NOT NULL GROUP BY {keys}) AS surveys "
+        f"WHERE end_seconds > start_seconds GROUP BY {groups}"
+    )
+    return query(path, sql)
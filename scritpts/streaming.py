@@ -0,0 +1,150 @@
+# streaming.py
+import logging
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from data_preprocessing import (
+    clean_data,
+    cleaned_columns,
+    compute_cleaning_stats,
+    merge_summaries,
+    standardize_column_names,
+    summarize_partition,
+    valid_rows,
+)
+from dataset import CLEANED_DATASET, to_arrow, write_stream
+
+# Memory budget used to size chunks when no explicit chunk size is given
+DEFAULT_MAX_MEMORY_MB = 256
+
+# Rough number of chunk-sized copies alive at once while a chunk is cleaned and encoded
+MEMORY_OVERHEAD = 6
+
+class RowHashes:
+    """
+    Set of 64-bit row hashes kept as sorted NumPy runs, costing 8 bytes per distinct row.
+    """
+
+    def __init__(self, max_runs=8):
+        self.runs = []
+        self.max_runs = max_runs
+
+    def add_new(self, hashes):
+        """
+        Record the given hashes and return a mask of those not seen before.
+
+        Only the first occurrence of a hash repeated within `hashes` counts as new.
+        """
+        first = ~pd.Series(hashes).duplicated().to_numpy()
+        new = first.copy()
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            new &= run[positions] != hashes
+        if new.any():
+            self.runs.append(np.sort(hashes[new]))
+            if len(self.runs) > self.max_runs:
+                self.runs = [np.sort(np.concatenate(self.runs))]
+        return new
+
+def _row_hashes(chunk):
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+def source_columns(path):
+    """
+    Return the standardized column names of a source file and whether it holds any rows.
+    """
+    if path.endswith(".csv"):
+        columns, has_rows = pd.read_csv(path, nrows=1).columns, True
+    else:
+        metadata = pq.ParquetFile(path)
+        columns, has_rows = pd.Index(metadata.schema_arrow.names), metadata.metadata.num_rows > 0
+    columns = columns.str.strip().str.replace(" ", "_").str.lower()
+    return list(dict.fromkeys(list(columns) + ['location_type'])), has_rows
+
+def iter_chunks(path, chunk_size):
+    """
+    Yield DataFrames of at most `chunk_size` rows from a Parquet or CSV file.
+    """
+    if path.endswith(".csv"):
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+def estimate_chunk_size(sources, max_memory_mb=DEFAULT_MAX_MEMORY_MB, sample_rows=1000):
+    """
+    Pick a chunk size (in rows) that keeps cleaning within roughly `max_memory_mb`.
+    """
+    for _, path in sources:
+        sample = next(iter_chunks(path, sample_rows), None)
+        if sample is not None and len(sample):
+            bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+            return max(1, int(max_memory_mb * 2**20 / (bytes_per_row * MEMORY_OVERHEAD)))
+    return sample_rows
+
+def _prepare_chunk(chunk, location_type, columns):
+    chunk = chunk.copy()
+    chunk['Location_Type'] = location_type
+    return standardize_column_names(chunk).reindex(columns=columns)
+
+def clean_streaming(sources, output_path=CLEANED_DATASET, chunk_size=None,
+                    max_memory_mb=DEFAULT_MAX_MEMORY_MB, outlier_mode='sequential', quarantine=None):
+    """
+    Clean, merge and save observations chunk by chunk, with memory bounded by the chunk size.
+
+    `sources` is a list of (location_type, path) pairs of Parquet or CSV files, such as
+    the cached sheets returned by ingestion.cache_workbooks. A first pass collects each
+    habitat's statistics summary of the valid rows and the hashes of the rows kept by
+    remove_duplicates; a second pass fills, deduplicates, filters and converts each chunk
+    with those global statistics and appends it to the output dataset. The result matches running
+    clean_data on each habitat and merge_datasets on the whole input.
+    Deduplication keeps 8 bytes per distinct row; everything else is bounded by
+    `chunk_size`, which defaults to a size derived from `max_memory_mb`.
+    Rows failing validation are appended to `quarantine`, if given, as by clean_data.
+    """
+    chunk_size = chunk_size or estimate_chunk_size(sources, max_memory_mb)
+    logging.info(f"Streaming {len(sources)} source(s) in chunks of {chunk_size} rows...")
+
+    # Column layout, as pd.concat of each habitat's non-empty sources would produce it
+    habitat_columns = {}
+    for location_type in dict.fromkeys(location_type for location_type, _ in sources):
+        described = [source_columns(path) for habitat, path in sources if habitat == location_type]
+        non_empty = [columns for columns, has_rows in described if has_rows] or [described[0][0]]
+        habitat_columns[location_type] = list(dict.fromkeys(col for columns in non_empty for col in columns))
+
+    # First pass: statistics summaries of the deduplicated, valid rows
+    summaries = {location_type: pd.Series(dtype='int64') for location_type in habitat_columns}
+    seen = RowHashes()
+    for location_type, path in sources:
+        for chunk in iter_chunks(path, chunk_size):
+            chunk = _prepare_chunk(chunk, location_type, habitat_columns[location_type])
+            chunk = chunk[seen.add_new(_row_hashes(chunk))]
+            chunk = chunk[valid_rows(chunk)]
+            summaries[location_type] = merge_summaries([summaries[location_type], summarize_partition(chunk)])
+    stats = {
+        location_type: compute_cleaning_stats(summary, outlier_mode=outlier_mode)
+        for location_type, summary in summaries.items()
+    }
+    del seen
+
+    # Output columns, as merge_datasets aligns them
+    habitat_outputs = [cleaned_columns(columns) for columns in habitat_columns.values()]
+    output_columns = habitat_outputs[0]
+    for columns in habitat_outputs[1:]:
+        output_columns = [col for col in output_columns if col in columns]
+
+    # Second pass: clean each chunk with the global statistics and write it out
+    def cleaned_tables():
+        seen = RowHashes()
+        for location_type, path in sources:
+            for chunk in iter_chunks(path, chunk_size):
+                chunk = _prepare_chunk(chunk, location_type, habitat_columns[location_type])
+                chunk = chunk[seen.add_new(_row_hashes(chunk))]
+                if len(chunk):
+                    yield to_arrow(clean_data(chunk, stats[location_type], quarantine=quarantine)[output_columns])
+
+    rows = write_stream(cleaned_tables(), output_path, rows_per_group=chunk_size)
+    logging.info(f"Streamed {rows} cleaned rows to {output_path}")
+    return rows
@@ -0,0 +1,88 @@
+# temporal.py
+import numpy as np
+import pandas as pd
+
+# Time-of-day columns parsed during preprocessing, and the seconds columns they become
+TIME_COLUMNS = {'start_time': 'start_seconds', 'end_time': 'end_seconds'}
+
+# Columns identifying one survey: a visit to a plot on a date starting at a given time
+SURVEY_KEYS = ['plot_name', 'date', 'visit', 'start_seconds']
+
+# Attributes that are constant within a survey, so effort can be grouped by them
+SURVEY_ATTRIBUTES = ['location_type', 'admin_unit_code', 'observer']
+
+def seconds_since_midnight(times):
+    """
+    Convert time values (datetime.time or 'HH:MM:SS' strings) to integer seconds since midnight.
+
+    Each distinct time is parsed once and the result is broadcast back by code, so the
+    cost per row is a single take. Unparseable or missing times become <NA> (Int32).
+    """
+    times = pd.Series(times)
+    codes, uniques = pd.factorize(times, use_na_sentinel=True)
+    offsets = pd.to_timedelta(pd.Index(uniques).astype(str), errors='coerce')
+    seconds = np.append(offsets.total_seconds().to_numpy(dtype='float64', na_value=np.nan), np.nan)
+    return pd.Series(seconds[codes], index=times.index).astype('Int32')
+
+def add_time_of_day(data):
+    """
+    Add the 'start_seconds' and 'end_seconds' columns parsed from the time columns present.
+    """
+    for column, seconds_column in TIME_COLUMNS.items():
+        if column in data.columns:
+            data[seconds_column] = seconds_since_midnight(data[column])
+    return data
+
+def hour_of_day(seconds):
+    """
+    Bin seconds since midnight into hours of the day (0-23), keeping missing values.
+    """
+    return pd.Series(seconds) // 3600
+
+def survey_events(data, attributes=SURVEY_ATTRIBUTES):
+    """
+    Return one row per survey with its start hour and duration in minutes.
+
+    A survey is identified by SURVEY_KEYS; the `attributes` present in `data` are kept
+    and must be constant within a survey. Surveys without a start time or with a missing
+    or non-positive duration are dropped, as they carry no usable effort.
+    """
+    extra = [col for col in attributes if col not in SURVEY_KEYS]
+    columns = [col for col in SURVEY_KEYS + extra + ['end_seconds'] if col in data.columns]
+    events = data[columns].drop_duplicates(SURVEY_KEYS)
+    minutes = (events['end_seconds'] - events['start_seconds']) / 60
+    events = events.assign(start_hour=hour_of_day(events['start_seconds']), survey_minutes=minutes)
+    return events[events['survey_minutes'] > 0].reset_index(drop=True)
+
+def survey_effort(data, by=()):
+    """
+    Survey effort per start hour and group: number of surveys and total survey minutes.
+    """
+    groups = survey_events(data, by).groupby(['start_hour', *by], observed=True)
+    return groups.agg(surveys=('survey_minutes', 'size'), survey_minutes=('survey_minutes', 'sum')).reset_index()
+
+def detection_rates(detections, effort, by=(), per_minutes=60):
+    """
+    Combine detection counts with survey effort into detections per `per_minutes` of survey.
+
+    `detections` holds 'start_hour', the effort groups `by` and any finer keys (such as
+    species) with a 'detections' column; `effort` comes from survey_effort with the same
+    `by`. Detections are joined to the effort of their hour and group.
+    """
+    rates = detections.merge(effort, on=['start_hour', *by], how='inner')
+    rates['detection_rate'] = rates['detections'] / rates['survey_minutes'] * per_minutes
+    return rates
+
+def hourly_detection_rates(data, by=('location_type',), species=None, per_minutes=60):
+    """
+    Effort-normalized detection rates per start hour and group, optionally per species.
+
+    Detections are observation rows; effort is the total duration of the surveys that
+    started in the same hour and group, so hours and habitats surveyed more often no
+    longer look busier. `by` must be constant within a survey (see SURVEY_ATTRIBUTES).
+    """
+    by = list(by)
+    keys = ['start_hour', *by] + ([species] if species else [])
+    rows = data.assign(start_hour=hour_of_day(data['start_seconds']))
+    detections = rows.groupby(keys, observed=True).size().reset_index(name='detections')
+    return detection_rates(detections, survey_effort(data, by), by, per_minutes)
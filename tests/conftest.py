@@ -0,0 +1,54 @@
+# conftest.py
+import os
+import sys
+
+import pytest
+
+# The modules import each other by name, as when the scripts run from the project root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "scritpts"), os.path.join(ROOT, "benchmarks")]
+
+def _rebuild(sheets, path):
+    """
+    Clean {location_type: {sheet: DataFrame}} from scratch, as main does, and save the dataset at `path`.
+    """
+    from data_preprocessing import _combine_sheets, clean_data, merge_datasets, save_cleaned_data
+
+    habitats = []
+    for location_type, workbook in sheets.items():
+        data = _combine_sheets(workbook)
+        data['Location_Type'] = location_type
+        habitats.append(clean_data(data))
+    save_cleaned_data(merge_datasets(*habitats), path)
+    return path
+
+@pytest.fixture(scope="session")
+def synthetic_sheets():
+    """
+    Small synthetic workbooks with one sheet per admin unit, as {location_type: {sheet: DataFrame}}.
+    """
+    from synthetic import synthetic_workbooks
+
+    return {
+        data['Location_Type'].iloc[0]: {
+            unit: sheet.drop(columns='Location_Type').reset_index(drop=True)
+            for unit, sheet in data.groupby('Admin_Unit_Code', sort=True)
+        }
+        for data in synthetic_workbooks(scale=0.05)
+    }
+
+@pytest.fixture(scope="session")
+def cleaned_dataset(synthetic_sheets, tmp_path_factory):
+    """
+    The cleaned dataset of the synthetic workbooks, built by the real pipeline steps.
+    """
+    return _rebuild(synthetic_sheets, str(tmp_path_factory.mktemp("dataset") / "cleaned_bird_data"))
+
+@pytest.fixture
+def full_rebuild(tmp_path):
+    """
+    Function cleaning the given sheets from scratch and returning the saved dataset's path.
+    """
+    def rebuild(sheets):
+        return _rebuild(sheets, str(tmp_path / f"rebuild-{len(os.listdir(tmp_path))}"))
+    return rebuild
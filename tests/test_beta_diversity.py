@@ -0,0 +1,34 @@
+# test_beta_diversity.py
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial.distance import cdist
+
+from beta_diversity import dissimilarity_matrix, nearest_plots
+
+def _plots(rows=23, species=15, seed=0):
+    """
+    A random sparse plot x species count matrix in which every plot has at least one species.
+    """
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, 9, (rows, species)) * (rng.random((rows, species)) < 0.3)
+    counts[np.arange(rows), rng.integers(0, species, rows)] += 1
+    return sparse.csr_matrix(counts)
+
+def test_blocked_dissimilarities_match_scipy():
+    matrix = _plots()
+    dense = matrix.toarray()
+    # Blocks smaller than the plot count, with a partial last block
+    np.testing.assert_allclose(dissimilarity_matrix(matrix, 'jaccard', block_size=5), cdist(dense > 0, dense > 0, 'jaccard'))
+    np.testing.assert_allclose(dissimilarity_matrix(matrix, 'bray_curtis', block_size=5), cdist(dense, dense, 'braycurtis'))
+
+def test_nearest_plots_are_the_closest_other_plots():
+    matrix = _plots()
+    plots = pd.Index([f"P{i:02d}" for i in range(matrix.shape[0])], name='plot_name')
+    distances = cdist(matrix.toarray(), matrix.toarray(), 'braycurtis')[3]
+
+    nearest = nearest_plots(matrix, plots, 'P03', k=5, metric='bray_curtis')
+    assert len(nearest) == 5 and 'P03' not in set(nearest['plot_name'])
+    np.testing.assert_allclose(nearest['dissimilarity'], np.sort(np.delete(distances, 3))[:5])
+    np.testing.assert_allclose(nearest['dissimilarity'], distances[plots.get_indexer(nearest['plot_name'])])
+    np.testing.assert_allclose(nearest['similarity'], 1 - nearest['dissimilarity'])
@@ -0,0 +1,33 @@
+# test_biodiversity.py
+import numpy as np
+from scipy import sparse
+
+from biodiversity import diversity_indices, rarefaction
+
+# Counts 4, 2, 1, 1 of four species (N = 8, p = 1/2, 1/4, 1/8, 1/8), and an empty site
+COUNTS = sparse.csr_matrix(np.array([[4, 0, 2, 1, 1], [0, 0, 0, 0, 0]]))
+
+def test_diversity_indices_of_a_known_vector():
+    indices = diversity_indices(COUNTS)
+    assert indices['observations'].tolist() == [8, 0]
+    assert indices['richness'].tolist() == [4, 0]
+    # Shannon: -(1/2 ln 1/2 + 1/4 ln 1/4 + 2/8 ln 1/8) = 7/4 ln 2
+    np.testing.assert_allclose(indices['shannon'][0], 1.75 * np.log(2))
+    # Gini-Simpson: 1 - (1/4 + 1/16 + 2/64)
+    np.testing.assert_allclose(indices['simpson'][0], 0.65625)
+    # Chao1 with two singletons and one doubleton: 4 + 2 * 1 / (2 * 2)
+    np.testing.assert_allclose(indices['chao1'], [4.5, 0])
+    assert indices[['shannon', 'simpson']].iloc[1].isna().all()
+
+def test_rarefaction_of_a_known_vector():
+    expected = rarefaction(COUNTS, [1, 2, 8, 9])
+    # Depth 2: 4 - (C(4,2) + C(6,2) + 2 C(7,2)) / C(8,2) = 4 - 63/28
+    np.testing.assert_allclose(expected[0], [1, 1.75, 4, np.nan])
+    assert np.isnan(expected[1]).all()
+
+def test_rarefied_richness_at_full_depth_is_the_observed_richness():
+    rng = np.random.default_rng(0)
+    matrix = sparse.csr_matrix(rng.integers(0, 6, (10, 20)) * (rng.random((10, 20)) < 0.4))
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    full_depth = np.array([rarefaction(matrix[row], [total])[0, 0] for row, total in enumerate(totals) if total])
+    np.testing.assert_allclose(full_depth, np.diff(matrix.indptr)[totals > 0])
@@ -0,0 +1,45 @@
+# test_chart_policy.py
+import logging
+
+import pandas as pd
+import plotly.express as px
+
+from chart_policy import (
+    OTHER_LABEL,
+    WEBGL_POINT_THRESHOLD,
+    figure_points,
+    log_figure_payload,
+    scatter_render_mode,
+    top_n_with_other,
+)
+
+def test_top_n_breaks_ties_by_label():
+    table = pd.DataFrame({'aou_code': ['SOSP', 'COGR', 'EATO', 'AMRO'], 'count': [5, 5, 5, 9]})
+    for order in ([0, 1, 2, 3], [3, 2, 1, 0], [2, 0, 3, 1]):
+        kept = top_n_with_other(table.iloc[order], 'aou_code', 'count', 2)
+        assert kept['aou_code'].tolist() == ['AMRO', 'COGR', OTHER_LABEL]
+        assert kept['count'].tolist() == [9, 5, 10]
+
+def test_large_line_charts_use_webgl():
+    assert scatter_render_mode(WEBGL_POINT_THRESHOLD) == 'svg'
+    assert scatter_render_mode(WEBGL_POINT_THRESHOLD + 1) == 'webgl'
+
+    points = pd.DataFrame({'start_hour': range(WEBGL_POINT_THRESHOLD + 1), 'detection_rate': 1.0})
+    fig = px.line(points, x='start_hour', y='detection_rate', render_mode=scatter_render_mode(len(points)))
+    assert fig.data[0].type == 'scattergl'
+    fig = px.line(points.head(24), x='start_hour', y='detection_rate', render_mode=scatter_render_mode(24))
+    assert fig.data[0].type == 'scatter'
+
+def test_payload_is_only_serialized_for_debug_logging(monkeypatch, caplog):
+    fig = px.pie(pd.DataFrame({'flyover_observed': [True, False], 'count': [3, 7]}),
+                 names='flyover_observed', values='count')
+    assert figure_points(fig) == 2
+
+    calls = []
+    monkeypatch.setattr(type(fig), 'to_json', lambda self, *args, **kwargs: calls.append(1) or "{}")
+    caplog.set_level(logging.INFO, logger='chart_policy')
+    assert log_figure_payload('flyover', fig) == 2
+    assert calls == []
+    caplog.set_level(logging.DEBUG, logger='chart_policy')
+    log_figure_payload('flyover', fig)
+    assert calls == [1]
@@ -0,0 +1,20 @@
+# test_data_preprocessing.py
+import pandas as pd
+
+from data_preprocessing import clean_data
+from synthetic import synthetic_habitat
+
+def test_unparseable_cell_keeps_the_column_in_the_statistics():
+    data = synthetic_habitat('Forest', scale=0.05)
+    # An in-range temperature far from the rest, which outlier removal must drop
+    data.loc[data.index[10], 'Temperature'] = 44.0
+    bad = data.astype({'Temperature': object})
+    bad.loc[bad.index[3], 'Temperature'] = 'n/a'
+
+    quarantine = []
+    cleaned = clean_data(bad.copy(), quarantine=quarantine)
+    expected = clean_data(data.drop(index=data.index[3]))
+
+    assert len(quarantine) == 1 and len(quarantine[0]) == 1
+    assert 10 not in cleaned.index
+    pd.testing.assert_frame_equal(cleaned, expected)
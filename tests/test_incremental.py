@@ -0,0 +1,50 @@
+# test_incremental.py
+import numpy as np
+import pandas as pd
+
+import incremental
+from dataset import read_dataset
+
+FOREST_FILE, GRASSLAND_FILE = "forest.xlsx", "grassland.xlsx"
+
+def _rows(path, units=None):
+    """
+    The rows of a saved dataset in a fixed order, optionally only those of some admin units.
+    """
+    data = read_dataset(path)
+    data = data.astype({column: object for column in data.select_dtypes('category').columns})
+    if units is not None:
+        data = data[data['admin_unit_code'].isin(units)]
+    data = data[sorted(data.columns)]
+    return data.sort_values(list(data.columns)).reset_index(drop=True)
+
+def _run(sheets, output_path, manifest_path, monkeypatch):
+    workbooks = {FOREST_FILE: sheets['Forest'], GRASSLAND_FILE: sheets['Grassland']}
+    monkeypatch.setattr(incremental, 'read_workbooks', lambda paths, **options: workbooks)
+    incremental.run_incremental(FOREST_FILE, GRASSLAND_FILE, output_path, cache_dir=None, manifest_path=manifest_path)
+
+def test_incremental_updates_match_a_full_rebuild(synthetic_sheets, full_rebuild, monkeypatch, tmp_path):
+    output_path, manifest_path = str(tmp_path / "cleaned_bird_data"), str(tmp_path / "manifest.json")
+    sheets = {location_type: dict(workbook) for location_type, workbook in synthetic_sheets.items()}
+    # Missing temperatures in a sheet that never changes, filled with the habitat's median
+    untouched = sheets['Forest']['CHOH'].copy()
+    untouched.loc[untouched.index[::5], 'Temperature'] = np.nan
+    sheets['Forest']['CHOH'] = untouched
+
+    _run(sheets, output_path, manifest_path, monkeypatch)
+    before = full_rebuild(sheets)
+    pd.testing.assert_frame_equal(_rows(output_path), _rows(before))
+
+    # A warmer sheet shifts the forest median, and with it the unchanged sheet's filled rows
+    changed = {location_type: dict(workbook) for location_type, workbook in sheets.items()}
+    changed['Forest']['PRWI'] = changed['Forest']['PRWI'].assign(Temperature=lambda data: data['Temperature'] + 4)
+    del changed['Grassland']['MONO']
+
+    _run(changed, output_path, manifest_path, monkeypatch)
+    after = full_rebuild(changed)
+    assert not _rows(before, ['CHOH']).equals(_rows(after, ['CHOH']))
+    pd.testing.assert_frame_equal(_rows(output_path), _rows(after))
+
+    # Nothing changed since the last run
+    _run(changed, output_path, manifest_path, monkeypatch)
+    pd.testing.assert_frame_equal(_rows(output_path), _rows(after))
@@ -0,0 +1,23 @@
+# test_ingestion.py
+import os
+
+import ingestion
+
+def test_sheet_names_that_sanitize_alike_get_distinct_cache_files(tmp_path):
+    first = ingestion.sheet_cache_path(str(tmp_path), "0" * 64, "A B")
+    second = ingestion.sheet_cache_path(str(tmp_path), "0" * 64, "A_B")
+    assert first != second
+
+def test_evict_cache_keeps_recent_and_in_use_versions(tmp_path):
+    fingerprints = [f"{i:x}" * 64 for i in range(6)]
+    for age, fingerprint in enumerate(fingerprints):
+        path = tmp_path / f"{fingerprint[:16]}_sheets.json"
+        path.write_text("[]")
+        os.utime(path, (1000 - age, 1000 - age))
+    (tmp_path / "manifest.json").write_text("{}")
+
+    evicted = ingestion.evict_cache(str(tmp_path), keep=2, in_use=[fingerprints[5]])
+    assert sorted(evicted) == sorted(fingerprint[:16] for fingerprint in fingerprints[2:5])
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [f"{fingerprints[i][:16]}_sheets.json" for i in (0, 1, 5)] + ["manifest.json"]
+    )
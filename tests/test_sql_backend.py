@@ -0,0 +1,35 @@
+# test_sql_backend.py
+import os
+
+import pytest
+
+import sql_backend
+from cube import CUBOIDS
+
+FILTERS = {'location_type': ['Forest']}
+
+def _sorted(cells):
+    keys = [col for col in cells.columns if col != 'count']
+    return cells.astype({col: str for col in keys}).sort_values(keys).reset_index(drop=True)
+
+def test_sqlite_and_duckdb_answer_the_same_cells(cleaned_dataset, tmp_path):
+    pytest.importorskip("duckdb")
+    sqlite_path, duckdb_path = str(tmp_path / "observations.sqlite"), str(tmp_path / "observations.duckdb")
+    assert sql_backend.build_database(sqlite_path, cleaned_dataset) == sql_backend.build_database(duckdb_path, cleaned_dataset)
+    assert sorted(os.listdir(tmp_path)) == ["observations.duckdb", "observations.sqlite"]
+
+    assert sql_backend.available_cuboids(duckdb_path) == set(CUBOIDS)
+    for name in CUBOIDS:
+        expected = _sorted(sql_backend.cuboid_cells(sqlite_path, name, FILTERS))
+        actual = _sorted(sql_backend.cuboid_cells(duckdb_path, name, FILTERS))
+        assert actual.equals(expected), name
+    sql_backend.retire_connections()
+
+def test_retired_connections_are_closed(cleaned_dataset, tmp_path):
+    path = str(tmp_path / "observations.sqlite")
+    sql_backend.build_database(path, cleaned_dataset)
+    with sql_backend.connection(path) as borrowed:
+        sql_backend.retire_connections()
+    assert path not in sql_backend._pools
+    with pytest.raises(Exception):
+        borrowed.execute("SELECT 1")
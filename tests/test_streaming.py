@@ -0,0 +1,42 @@
+# test_streaming.py
+import numpy as np
+import pandas as pd
+
+from dataset import read_dataset
+from streaming import RowHashes, clean_streaming
+
+def _rows(path):
+    """
+    The rows of a saved dataset in a fixed order.
+    """
+    data = read_dataset(path)
+    data = data.astype({column: object for column in data.select_dtypes('category').columns})
+    data = data[sorted(data.columns)]
+    return data.sort_values(list(data.columns)).reset_index(drop=True)
+
+def test_row_hashes_flag_repeats_within_and_across_calls():
+    seen = RowHashes(max_runs=2)
+    assert seen.add_new(np.array([5, 3, 5, 9], dtype=np.uint64)).tolist() == [True, True, False, True]
+    assert seen.add_new(np.array([1, 3, 1], dtype=np.uint64)).tolist() == [True, False, False]
+    assert seen.add_new(np.array([9, 9], dtype=np.uint64)).tolist() == [False, False]
+    # A third run merges the runs into one, which must still know every hash
+    assert seen.add_new(np.array([0, 12], dtype=np.uint64)).tolist() == [True, True]
+    assert len(seen.runs) == 1
+    assert seen.add_new(np.array([12, 7, 5, 0, 1, 3], dtype=np.uint64)).tolist() == [False, True, False, False, False, False]
+
+def test_streaming_matches_a_full_rebuild(synthetic_sheets, full_rebuild, tmp_path):
+    sheets = {location_type: dict(workbook) for location_type, workbook in synthetic_sheets.items()}
+    # Rows repeated in a later sheet of the same habitat, so duplicates span sources
+    sheets['Forest']['PRWI'] = pd.concat([sheets['Forest']['PRWI'], sheets['Forest']['ANTI'].iloc[:5]], ignore_index=True)
+
+    sources = []
+    for location_type, workbook in sheets.items():
+        for sheet, data in workbook.items():
+            path = str(tmp_path / f"{location_type}-{sheet}.parquet")
+            data.to_parquet(path, index=False)
+            sources.append((location_type, path))
+
+    # Chunks far smaller than a sheet, so the statistics and duplicates span chunks
+    output_path = str(tmp_path / "cleaned_bird_data")
+    clean_streaming(sources, output_path, chunk_size=16)
+    pd.testing.assert_frame_equal(_rows(output_path), _rows(full_rebuild(sheets)))